@@ -0,0 +1,81 @@
+"""
+Benchmark the batch endpoint against single-item task routes
+
+Creates, updates and deletes tasks through the Flask test client, once with
+one request per task and once through POST /api/v1/tasks/batch, and reports
+requests per second and tasks per second for each.
+
+Usage: python benchmarks/bench_batch.py [--tasks 5000] [--batch-size 100]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app import app  # noqa: E402
+from src.auth import create_user, generate_token  # noqa: E402
+
+
+def single_item(client, headers, count):
+    """Create, update and delete count tasks with one request each"""
+    ids = []
+    for i in range(count):
+        response = client.post("/api/v1/tasks", data=json.dumps({"title": f"Task {i}"}), headers=headers)
+        ids.append(response.get_json()["id"])
+    for task_id in ids:
+        client.put(f"/api/v1/tasks/{task_id}", data=json.dumps({"status": "completed"}), headers=headers)
+    for task_id in ids:
+        client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    return 3 * count
+
+
+def batched(client, headers, count, batch_size):
+    """Create, update and delete count tasks in batches of batch_size"""
+    requests = 0
+
+    def send(operations):
+        nonlocal requests
+        requests += 1
+        body = json.dumps({"operations": operations})
+        return client.post("/api/v1/tasks/batch", data=body, headers=headers).get_json()["results"]
+
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        created = send([{"op": "create", "data": {"title": f"Task {start + i}"}} for i in range(size)])
+        ids = [result["task"]["id"] for result in created]
+        send([{"op": "update", "id": task_id, "data": {"status": "completed"}} for task_id in ids])
+        send([{"op": "delete", "id": task_id} for task_id in ids])
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    user, _ = create_user("batcher", "batcher@example.com", "batch-password")
+    token = generate_token(user["id"], user["username"])
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    client = app.test_client()
+    operations = 3 * args.tasks
+
+    start = time.perf_counter()
+    requests = single_item(client, headers, args.tasks)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_requests = batched(client, headers, args.tasks, args.batch_size)
+    batch = time.perf_counter() - start
+
+    print(f"{'mode':>12} {'requests':>10} {'req/s':>10} {'tasks ops/s':>12}")
+    print(f"{'single-item':>12} {requests:>10} {requests / single:>10,.0f} {operations / single:>12,.0f}")
+    print(f"{'batch':>12} {batch_requests:>10} {batch_requests / batch:>10,.0f} {operations / batch:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
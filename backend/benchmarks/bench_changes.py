@@ -0,0 +1,68 @@
+"""
+Benchmark delta sync against reloading the full task list
+
+Creates N tasks for one user, changes a handful (updates and deletes), then
+compares GET /api/v1/tasks with GET /api/v1/tasks/changes?since=<watermark>
+taken before the changes: response size and latency. The delta should cost
+the same however many tasks the user has.
+
+Usage: python benchmarks/bench_changes.py [--sizes 1000,10000,100000] [--changes 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app import app, tasks  # noqa: E402
+from src.auth import create_user, generate_token  # noqa: E402
+
+
+def timed_get(client, url, headers, rounds):
+    """Mean latency in milliseconds and the response size in bytes"""
+    size = len(client.get(url, headers=headers).data)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        client.get(url, headers=headers)
+    return (time.perf_counter() - start) / rounds * 1000, size
+
+
+def run(client, size, changes, rounds):
+    tasks.clear()
+    user, _ = create_user(f"sync{size}", f"sync{size}@example.com", "sync-password")
+    headers = {"Authorization": f"Bearer {generate_token(user['id'], user['username'])}"}
+    for i in range(size):
+        tasks.create(user["id"], f"Task {i}", description="synced task")
+
+    # The watermark a client fully synced at this point would hold
+    watermark = f"{tasks.epoch}-{tasks.version(user['id'])}"
+    for i in range(changes):
+        task_id = 1 + i * (size // changes)
+        if i % 2:
+            tasks.delete(task_id, user["id"])
+        else:
+            tasks.update(task_id, user["id"], {"status": "completed"})
+
+    full = timed_get(client, "/api/v1/tasks", headers, max(1, rounds // 10))
+    delta = timed_get(client, f"/api/v1/tasks/changes?since={watermark}", headers, rounds)
+    return full, delta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--changes", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    client = app.test_client()
+    print(f"{'tasks':>8} {'full ms':>9} {'full KB':>9} {'delta ms':>9} {'delta KB':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        (full_ms, full_bytes), (delta_ms, delta_bytes) = run(client, size, args.changes, args.rounds)
+        print(f"{size:>8,} {full_ms:>9.2f} {full_bytes / 1024:>9.1f} {delta_ms:>9.2f} {delta_bytes / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark an unchanged polling client with and without ETags
+
+Polls GET /api/v1/tasks and GET /api/v1/tasks/stats for a user with N tasks,
+once unconditionally and once sending If-None-Match with the last ETag, and
+reports bytes sent and server CPU time per poll.
+
+Usage: python benchmarks/bench_etag.py [--tasks 1000] [--polls 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app import app, tasks  # noqa: E402
+from src.auth import create_user, generate_token  # noqa: E402
+
+
+def poll(client, url, headers, polls, conditional):
+    """Return (bytes per poll, CPU microseconds per poll)"""
+    etag = None
+    sent = 0
+    start = time.process_time()
+    for _ in range(polls):
+        request_headers = {**headers, "If-None-Match": etag} if conditional and etag else headers
+        response = client.get(url, headers=request_headers)
+        etag = response.headers.get("ETag")
+        sent += len(response.data)
+    return sent / polls, (time.process_time() - start) / polls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--polls", type=int, default=2000)
+    args = parser.parse_args()
+
+    user, _ = create_user("poller", "poller@example.com", "poll-password")
+    for i in range(args.tasks):
+        tasks.create(user["id"], f"Task {i}", description="polled task")
+    headers = {"Authorization": f"Bearer {generate_token(user['id'], user['username'])}"}
+    client = app.test_client()
+
+    print(f"{'endpoint':>20} {'mode':>12} {'bytes/poll':>12} {'CPU us/poll':>12}")
+    for url in ("/api/v1/tasks", "/api/v1/tasks/stats"):
+        for conditional in (False, True):
+            size, cpu = poll(client, url, headers, args.polls, conditional)
+            mode = "If-None-Match" if conditional else "plain"
+            print(f"{url:>20} {mode:>12} {size:>12,.0f} {cpu:>12,.1f}")
+
+
+if __name__ == "__main__":
+    main()
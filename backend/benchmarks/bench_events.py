@@ -0,0 +1,201 @@
+"""
+Load test the task event stream with thousands of concurrent subscribers
+
+Starts the API in a subprocess (gunicorn with gevent workers when gevent is
+installed, so idle streams are parked greenlets; otherwise werkzeug's
+threaded server), opens --subscribers SSE connections spread over --users
+users from a single selector loop, then creates tasks one user at a time and
+measures how long each event takes to reach every one of that user's
+streams. Server memory and thread count are read from /proc.
+
+Usage: python benchmarks/bench_events.py [--subscribers 5000] [--users 50] [--rounds 50]
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import selectors
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVE_WERKZEUG = (
+    "import logging, sys; from werkzeug.serving import make_server; from src.app import app; "
+    "logging.getLogger('werkzeug').setLevel(logging.ERROR); "
+    "make_server('127.0.0.1', int(sys.argv[1]), app, threaded=True).serve_forever()"
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def start_server(subscribers):
+    port = free_port()
+    env = {
+        **os.environ,
+        "BCRYPT_ROUNDS": "4",
+        "MAX_EVENT_SUBSCRIBERS": str(subscribers + 100),
+        "EVENT_HEARTBEAT_SECONDS": "30",
+    }
+    if importlib.util.find_spec("gevent"):
+        server = "gunicorn -k gevent"
+        command = [sys.executable, "-m", "gunicorn", "-k", "gevent", "--bind", f"127.0.0.1:{port}"]
+        command += ["--worker-connections", str(subscribers + 100), "--backlog", "4096", "src.app:app"]
+    else:
+        server = "werkzeug threaded (install gevent for greenlet workers)"
+        command = [sys.executable, "-c", SERVE_WERKZEUG, str(port)]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if request(port, "GET", "/health")[0] == 200:
+                return process, port, server
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+
+def server_status(pid):
+    """VmRSS in MB and thread count of the server (its gunicorn worker if any)"""
+    children = f"/proc/{pid}/task/{pid}/children"
+    if os.path.exists(children):
+        with open(children) as f:
+            pid = int((f.read().split() or [pid])[0])
+    with open(f"/proc/{pid}/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return int(fields["VmRSS"].split()[0]) / 1024, int(fields["Threads"])
+
+
+class Subscriber:
+    """One SSE connection read line by line from the selector loop"""
+
+    def __init__(self, user, sock):
+        self.user = user
+        self.sock = sock
+        self.buffer = b""
+        self.ready = False
+        self.created = 0
+
+    def feed(self, data):
+        lines = (self.buffer + data).split(b"\n")
+        self.buffer = lines.pop()
+        for line in lines:
+            if line.startswith(b"retry:"):
+                self.ready = True
+            elif line.startswith(b"event: created"):
+                self.created += 1
+
+
+def pump(selector, timeout):
+    """Read whatever the open streams have received; returns the time of the read"""
+    for key, _ in selector.select(timeout):
+        data = key.fileobj.recv(65536)
+        if data:
+            key.data.feed(data)
+        else:
+            selector.unregister(key.fileobj)
+    return time.perf_counter()
+
+
+def connect_all(port, users, count, selector, batch=250):
+    subscribers = []
+    for i in range(count):
+        user = users[i % len(users)]
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall(
+            f"GET /api/v1/tasks/events HTTP/1.1\r\nHost: localhost\r\n"
+            f"Authorization: Bearer {user['token']}\r\n\r\n".encode()
+        )
+        sock.setblocking(False)
+        subscriber = Subscriber(user, sock)
+        selector.register(sock, selectors.EVENT_READ, subscriber)
+        subscribers.append(subscriber)
+        if len(subscribers) % batch == 0:
+            # Let the server accept and answer before piling up more connections
+            while sum(s.ready for s in subscribers) < len(subscribers) - batch // 2:
+                pump(selector, 1)
+    deadline = time.monotonic() + 60
+    while not all(s.ready for s in subscribers) and time.monotonic() < deadline:
+        pump(selector, 1)
+    return subscribers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    process, port, server = start_server(args.subscribers)
+    selector = selectors.DefaultSelector()
+    try:
+        users = []
+        for i in range(args.users):
+            credentials = {"username": f"sub{i}", "email": f"sub{i}@example.com", "password": "events-password"}
+            _, body = request(port, "POST", "/api/v1/auth/register", credentials, {"Content-Type": "application/json"})
+            users.append({"index": i, "token": json.loads(body)["token"]})
+
+        start = time.perf_counter()
+        subscribers = connect_all(port, users, args.subscribers, selector)
+        connected = sum(s.ready for s in subscribers)
+        print(f"server:      {server}")
+        print(f"connected:   {connected:,} streams in {time.perf_counter() - start:.1f} s")
+        rss, threads = server_status(process.pid)
+        print(f"idle server: {rss:,.0f} MB RSS, {threads:,} threads")
+
+        delivery, fan_out = [], []
+        for round_number in range(args.rounds):
+            user = users[round_number % len(users)]
+            audience = [s for s in subscribers if s.user is user]
+            expected = [s.created + 1 for s in audience]
+            headers = {"Authorization": f"Bearer {user['token']}", "Content-Type": "application/json"}
+
+            sent = time.perf_counter()
+            request(port, "POST", "/api/v1/tasks", {"title": f"Event {round_number}"}, headers)
+            waiting = dict(zip(audience, expected))
+            deadline = time.monotonic() + 30
+            while waiting and time.monotonic() < deadline:
+                now = pump(selector, 1)
+                for subscriber in [s for s, want in waiting.items() if s.created >= want]:
+                    delivery.append((now - sent) * 1000)
+                    del waiting[subscriber]
+            fan_out.append((time.perf_counter() - sent) * 1000)
+
+        ordered = sorted(delivery)
+        print(f"delivered:   {len(delivery):,} events to {len(subscribers) // len(users)} streams per change")
+        print(
+            f"delivery:    p50 {statistics.median(ordered):.1f} ms   p99 {ordered[int(len(ordered) * 0.99) - 1]:.1f} ms"
+        )
+        print(f"fan-out:     p50 {statistics.median(fan_out):.1f} ms   max {max(fan_out):.1f} ms per change")
+        rss, threads = server_status(process.pid)
+        print(f"server:      {rss:,.0f} MB RSS, {threads:,} threads")
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark the NDJSON export: throughput and memory for 1M tasks
+
+Fills the in-memory store with one user's tasks, streams GET
+/api/v1/tasks/export through the test client and samples the process RSS
+after every chunk. RSS growth during the export must stay under --max-growth
+megabytes however many tasks are exported.
+
+Usage: python benchmarks/bench_export.py [--tasks 1000000] [--max-growth 64]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app import app, tasks  # noqa: E402
+from src.auth import create_user, generate_token  # noqa: E402
+
+
+def rss_mb():
+    """Current resident set size in megabytes (Linux)"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--max-growth", type=float, default=64.0)
+    args = parser.parse_args()
+
+    user, _ = create_user("exporter", "exporter@example.com", "export-password")
+    for i in range(args.tasks):
+        tasks.create(user["id"], f"Task {i}", description="exported task")
+    headers = {"Authorization": f"Bearer {generate_token(user['id'], user['username'])}"}
+
+    client = app.test_client()
+    baseline = peak = rss_mb()
+    exported = 0
+    start = time.perf_counter()
+    response = client.get("/api/v1/tasks/export", headers=headers, buffered=False)
+    for chunk in response.response:
+        exported += len(chunk)
+        peak = max(peak, rss_mb())
+    elapsed = time.perf_counter() - start
+    response.close()
+
+    growth = peak - baseline
+    print(f"tasks exported: {args.tasks:,}")
+    print(f"bytes:          {exported / 2**20:,.1f} MB in {elapsed:.2f} s ({exported / 2**20 / elapsed:,.1f} MB/s)")
+    print(f"RSS:            {baseline:,.1f} MB before, peak growth {growth:,.1f} MB")
+    if growth > args.max_growth:
+        sys.exit(f"RSS grew by {growth:.1f} MB, more than {args.max_growth} MB")
+
+
+if __name__ == "__main__":
+    main()
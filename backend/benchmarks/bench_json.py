@@ -0,0 +1,61 @@
+"""
+Benchmark serialisation of a 10k-task list response
+
+Encodes {"tasks": [...], "total": N} with the stdlib provider, the orjson
+provider, and the orjson provider reusing cached task encodings, then times a
+full GET /api/v1/tasks through the test client.
+
+Usage: python benchmarks/bench_json.py [--tasks 10000] [--rounds 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from src.app import app, task_json, tasks  # noqa: E402
+from src.auth import create_user, generate_token  # noqa: E402
+from src.json_provider import FastJSONProvider  # noqa: E402
+
+
+def time_ms(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    user, _ = create_user("serialiser", "serialiser@example.com", "json-password")
+    for i in range(args.tasks):
+        tasks.create(user["id"], f"Task {i}", description="a task with a description", priority="high")
+    page = tasks.list(user["id"])
+    payload = {"tasks": page, "total": len(page)}
+
+    stdlib = DefaultJSONProvider(app)
+    print(f"orjson available: {FastJSONProvider.use_orjson}")
+    print(
+        f"stdlib json.dumps:      {time_ms(lambda: stdlib.dumps(payload, separators=(',', ':')), args.rounds):8.2f} ms"
+    )
+    print(f"FastJSONProvider:       {time_ms(lambda: app.json.dumps_bytes(payload), args.rounds):8.2f} ms")
+    task_json.encode_many(page)
+    print(f"cached task encodings:  {time_ms(lambda: task_json.encode_many(page), args.rounds):8.2f} ms")
+
+    headers = {"Authorization": f"Bearer {generate_token(user['id'], user['username'])}"}
+    client = app.test_client()
+    size = len(client.get("/api/v1/tasks", headers=headers).data)
+    request_ms = time_ms(lambda: client.get("/api/v1/tasks", headers=headers), args.rounds)
+    print(f"GET /api/v1/tasks:      {request_ms:8.2f} ms ({size / 2**20:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load test task-route latency during a login storm
+
+Serves the app from a threaded WSGI server, then times GET /api/v1/tasks
+before and during a burst of concurrent logins. With bcrypt confined to the
+bounded hashing pool, task latency should stay close to the idle baseline and
+excess logins should be shed with 503 instead of piling up. Storm clients
+honour Retry-After before trying again.
+
+Usage: python benchmarks/bench_login_storm.py [--clients 32] [--seconds 5] [--hash-workers 2] [--queue-size 8]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def task_latencies(port, headers, count):
+    """Sequential GET /api/v1/tasks latencies in milliseconds"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        request(port, "GET", "/api/v1/tasks", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return f"p50 {statistics.median(ordered):7.2f} ms   p99 {ordered[int(len(ordered) * 0.99) - 1]:7.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--hash-workers", default="2")
+    parser.add_argument("--queue-size", default="8")
+    args = parser.parse_args()
+
+    os.environ["HASH_WORKERS"] = args.hash_workers
+    os.environ["HASH_QUEUE_SIZE"] = args.queue_size
+
+    from werkzeug.serving import make_server
+
+    from src import auth
+    from src.app import app
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    credentials = {"username": "storm", "email": "storm@example.com", "password": "storm-password"}
+    _, body = request(port, "POST", "/api/v1/auth/register", credentials, {"Content-Type": "application/json"})
+    headers = {"Authorization": f"Bearer {json.loads(body)['token']}", "Content-Type": "application/json"}
+    for i in range(50):
+        request(port, "POST", "/api/v1/tasks", {"title": f"Task {i}"}, headers)
+
+    print(f"idle:        {summarize(task_latencies(port, headers, 200))}")
+
+    retry_after = int(auth.HASH_RETRY_AFTER_SECONDS)
+    statuses = Counter()
+    stop = threading.Event()
+
+    def login_loop():
+        while not stop.is_set():
+            status, _ = request(port, "POST", "/api/v1/auth/login", credentials, {"Content-Type": "application/json"})
+            statuses[status] += 1
+            if status == 503:
+                # Well-behaved clients back off as told by Retry-After
+                stop.wait(retry_after)
+
+    storm = [threading.Thread(target=login_loop, daemon=True) for _ in range(args.clients)]
+    for thread in storm:
+        thread.start()
+
+    during = []
+    deadline = time.monotonic() + args.seconds
+    while time.monotonic() < deadline:
+        during.extend(task_latencies(port, headers, 10))
+
+    stop.set()
+    for thread in storm:
+        thread.join()
+    server.shutdown()
+
+    print(f"login storm: {summarize(during)}")
+    print(f"login responses: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark full-text search latency on 1M indexed tasks
+
+Fills one user's in-memory index with tasks whose titles and descriptions
+draw words from a Zipf-distributed vocabulary, then times TaskStore.search
+for single words, word prefixes and two-word queries picked from that
+vocabulary. The median of each kind must stay under --max-ms. Searches for
+the most frequent words, which match a large share of all tasks, are timed
+separately for reference.
+
+Usage: python benchmarks/bench_search.py [--tasks 1000000] [--vocabulary 50000] [--max-ms 1]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from itertools import accumulate
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.store import TaskStore  # noqa: E402
+
+
+def make_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))))
+    return sorted(words, key=lambda word: rng.random())
+
+
+def time_queries(store, queries):
+    """Per-query latencies in milliseconds"""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.search(1, query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return statistics.median(ordered), ordered[int(len(ordered) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--vocabulary", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--max-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+
+    store = TaskStore()
+    start = time.perf_counter()
+    for _ in range(args.tasks):
+        title = " ".join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(2, 6)))
+        description = " ".join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(0, 12)))
+        store.create(1, title, description=description)
+    elapsed = time.perf_counter() - start
+    print(f"indexed {args.tasks:,} tasks in {elapsed:.1f} s ({args.tasks / elapsed:,.0f} tasks/s)")
+
+    picks = [rng.choice(vocabulary) for _ in range(args.queries)]
+    kinds = {
+        "word": picks,
+        "prefix": [word[:4] for word in picks],
+        "two words": [f"{word} {rng.choice(vocabulary)[:5]}" for word in picks],
+    }
+
+    failed = []
+    print(f"{'query':>12} {'p50 ms':>10} {'p99 ms':>10}")
+    for kind, queries in kinds.items():
+        p50, p99 = summarize(time_queries(store, queries))
+        print(f"{kind:>12} {p50:>10.3f} {p99:>10.3f}")
+        if p50 > args.max_ms:
+            failed.append(kind)
+
+    for word in vocabulary[:3]:
+        matches = len(store.search(1, word))
+        print(f"common word {word!r}: {matches:,} matches in {summarize(time_queries(store, [word] * 5))[0]:.1f} ms")
+
+    if failed:
+        sys.exit(f"median search latency above {args.max_ms} ms for: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark task deletion throughput against store size
+
+Measures deletes per second for single tasks and for whole users (admin
+delete_user) on stores of increasing size. The list-rebuild column times the
+previous approach of copying the task list on every delete, for reference.
+
+Usage: python benchmarks/bench_task_deletes.py [--sizes 1000,10000,100000,1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_task_store import TASKS_PER_USER, fill  # noqa: E402
+
+from src.store import TaskStore  # noqa: E402
+
+LIST_REBUILD_MAX_SIZE = 100000
+
+
+def delete_tasks_rate(size, rounds):
+    """Deletes per second for single tasks spread over the whole store"""
+    store = TaskStore()
+    fill(store, size)
+    victims = range(1, size + 1, max(1, size // rounds))
+
+    start = time.perf_counter()
+    for task_id in victims:
+        store.delete(task_id, (task_id - 1) // TASKS_PER_USER + 1)
+    return len(victims) / (time.perf_counter() - start)
+
+
+def delete_users_rate(size, rounds):
+    """Users deleted per second, each owning TASKS_PER_USER tasks"""
+    store = TaskStore()
+    fill(store, size)
+    user_count = size // TASKS_PER_USER
+    victims = range(1, user_count + 1, max(1, user_count // rounds))
+
+    start = time.perf_counter()
+    for user_id in victims:
+        store.delete_user_tasks(user_id)
+    return len(victims) / (time.perf_counter() - start)
+
+
+def list_rebuild_rate(size, rounds):
+    """Deletes per second when every delete rebuilds a plain list"""
+    tasks = [{"id": i, "user_id": i // TASKS_PER_USER + 1} for i in range(1, size + 1)]
+    victims = range(1, size + 1, max(1, size // rounds))
+
+    start = time.perf_counter()
+    for task_id in victims:
+        tasks = [t for t in tasks if t["id"] != task_id]
+    return len(victims) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--rounds", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10} {'task deletes/s':>16} {'user deletes/s':>16} {'list rebuild/s':>16}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        rebuild = list_rebuild_rate(size, 20) if size <= LIST_REBUILD_MAX_SIZE else float("nan")
+        print(
+            f"{size:>10} {delete_tasks_rate(size, args.rounds):>16,.0f} "
+            f"{delete_users_rate(size, args.rounds):>16,.0f} {rebuild:>16,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark task store lookups against store size
+
+Fills the store with N tasks spread over users that own 100 tasks each and
+times the per-request store operations for one of those users. With indexed
+lookups the per-operation latency should stay flat as N grows.
+
+Usage: python benchmarks/bench_task_store.py [--sizes 1000,10000,100000,1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.store import TaskStore  # noqa: E402
+
+TASKS_PER_USER = 100
+STATUSES = ("pending", "in-progress", "completed")
+PRIORITIES = ("low", "medium", "high")
+
+
+def fill(store, size):
+    """Create size tasks spread over users owning TASKS_PER_USER tasks each"""
+    for i in range(size):
+        store.create(
+            i // TASKS_PER_USER + 1,
+            f"Task {i}",
+            description="benchmark task",
+            status=STATUSES[i % 3],
+            priority=PRIORITIES[i % 3],
+        )
+
+
+def time_op(fn, rounds):
+    """Return the mean latency of fn in microseconds"""
+    start = time.perf_counter()
+    for i in range(rounds):
+        fn(i)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def run(size, rounds):
+    store = TaskStore()
+    fill(store, size)
+
+    user_id = size // TASKS_PER_USER // 2 + 1
+    task_ids = [t["id"] for t in store.list(user_id)]
+
+    return {
+        "get": time_op(lambda i: store.get(task_ids[i % len(task_ids)], user_id), rounds),
+        "update": time_op(
+            lambda i: store.update(task_ids[i % len(task_ids)], user_id, {"status": STATUSES[i % 3]}), rounds
+        ),
+        "list": time_op(lambda i: store.list(user_id), rounds // 10),
+        "list_status": time_op(lambda i: store.list(user_id, status="pending"), rounds // 10),
+        "create_delete": time_op(lambda i: store.delete(store.create(user_id, "tmp")["id"], user_id), rounds),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    columns = ("get", "update", "list", "list_status", "create_delete")
+    print(f"{'tasks':>10} " + " ".join(f"{c + ' (us)':>18}" for c in columns))
+    for size in (int(s) for s in args.sizes.split(",")):
+        results = run(size, args.rounds)
+        print(f"{size:>10} " + " ".join(f"{results[c]:>18.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
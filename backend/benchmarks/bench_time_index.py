@@ -0,0 +1,70 @@
+"""
+Benchmark time-ordered task listing against the number of tasks
+
+Fills one user's in-memory store with N tasks, touches a few of them, then
+times a page of the newest tasks (sort=-created_at, limit 50) and an
+updated_since query returning only the touched tasks. Both are answered
+from the ordered time indexes and should stay flat as N grows, unlike the
+full scan and sort clients had to do before, which is timed for reference.
+
+Usage: python benchmarks/bench_time_index.py [--sizes 10000,100000,1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.store import TaskStore  # noqa: E402
+
+TOUCHED = 20
+
+
+def time_us(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def run(size, rounds):
+    store = TaskStore()
+    for i in range(size):
+        store.create(1, f"Task {i}")
+    since = datetime.now()
+    for task_id in range(1, size, size // TOUCHED):
+        store.update(task_id, 1, {"status": "completed"})
+    ranges = {"updated_at": (since, None)}
+
+    def scan():
+        recent = [t for t in store.list(1) if t["updated_at"] >= since.isoformat()]
+        return sorted(recent, key=lambda t: t["updated_at"])
+
+    assert len(store.list_by_time(1, "updated_at", ranges=ranges)) == len(scan())
+    return {
+        "newest_page": time_us(lambda: store.list_by_time(1, "created_at", True, limit=50), rounds),
+        "updated_since": time_us(lambda: store.list_by_time(1, "updated_at", ranges=ranges), rounds),
+        "scan_and_sort": time_us(scan, max(1, rounds // 1000)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10} {'newest_page':>12} {'updated_since':>14} {'scan_and_sort':>14}   (microseconds)")
+    for size in (int(s) for s in args.sizes.split(",")):
+        result = run(size, args.rounds)
+        print(
+            f"{size:>10,} {result['newest_page']:>12.1f} {result['updated_since']:>14.1f} "
+            f"{result['scan_and_sort']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
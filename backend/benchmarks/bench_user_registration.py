@@ -0,0 +1,49 @@
+"""
+Benchmark user registration and login lookup against user count
+
+Registers users through auth.create_user with bcrypt swapped for a no-op so
+the timings isolate the uniqueness checks and storage. Per-registration and
+per-lookup cost should stay constant as the user base grows.
+
+Usage: python benchmarks/bench_user_registration.py [--users 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import auth  # noqa: E402
+
+CHECKPOINT = 10000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    args = parser.parse_args()
+
+    # Keep hashing out of the measurement
+    auth.hash_password = lambda password: password
+    auth.verify_password = lambda plain, hashed: plain == hashed
+
+    print(f"{'users':>10} {'register (us)':>15} {'login (us)':>12}")
+    start = time.perf_counter()
+    for i in range(1, args.users + 1):
+        auth.create_user(f"user{i}", f"user{i}@example.com", "password")
+        if i % CHECKPOINT == 0:
+            register_us = (time.perf_counter() - start) / CHECKPOINT * 1e6
+
+            login_start = time.perf_counter()
+            for j in range(i - 1000, i):
+                auth.authenticate_user(f"user{j + 1}", "password")
+            login_us = (time.perf_counter() - login_start) / 1000 * 1e6
+
+            print(f"{i:>10} {register_us:>15.2f} {login_us:>12.2f}")
+            start = time.perf_counter()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark API throughput against gunicorn worker count
+
+Starts gunicorn with the SQLite backend and 1, 2, 4... workers, then drives
+GET /api/v1/tasks and POST /api/v1/tasks from client processes and reports
+requests per second. The in-memory backend is measured with one worker for
+reference, since it cannot be shared between workers.
+
+Usage: python benchmarks/bench_workers.py [--workers 1,2,4] [--clients 8] [--seconds 5]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+
+def start_server(workers, backend, database_path):
+    port = free_port()
+    env = {**os.environ, "STORAGE_BACKEND": backend, "DATABASE_PATH": database_path, "BCRYPT_ROUNDS": "4"}
+    command = [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)]
+    process = subprocess.Popen(
+        [*command, "src.app:app"], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if request(port, "GET", "/health")[0] == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def client(port, headers, seconds, results):
+    """Mix of 9 list reads to 1 create until the deadline"""
+    done = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if done % 10 == 9:
+            request(port, "POST", "/api/v1/tasks", {"title": "bench"}, headers)
+        else:
+            request(port, "GET", "/api/v1/tasks", headers=headers)
+        done += 1
+    results.put(done)
+
+
+def measure(workers, backend, clients, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        process, port = start_server(workers, backend, os.path.join(tmp, "tasks.db"))
+        try:
+            credentials = {"username": "bench", "email": "bench@example.com", "password": "bench-password"}
+            request(port, "POST", "/api/v1/auth/register", credentials, {"Content-Type": "application/json"})
+            _, body = request(port, "POST", "/api/v1/auth/login", credentials, {"Content-Type": "application/json"})
+            headers = {"Authorization": f"Bearer {json.loads(body)['token']}", "Content-Type": "application/json"}
+            for i in range(20):
+                request(port, "POST", "/api/v1/tasks", {"title": f"Task {i}"}, headers)
+
+            results = multiprocessing.Queue()
+            procs = [
+                multiprocessing.Process(target=client, args=(port, headers, seconds, results)) for _ in range(clients)
+            ]
+            for proc in procs:
+                proc.start()
+            total = sum(results.get() for _ in procs)
+            for proc in procs:
+                proc.join()
+            return total / seconds
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'backend':>8} {'workers':>8} {'req/s':>10}")
+    print(f"{'memory':>8} {1:>8} {measure(1, 'memory', args.clients, args.seconds):>10,.0f}")
+    for workers in (int(w) for w in args.workers.split(",")):
+        print(f"{'sqlite':>8} {workers:>8} {measure(workers, 'sqlite', args.clients, args.seconds):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,72 @@
 import os
-from datetime import datetime
+import zlib
+from datetime import datetime, timedelta
+from functools import wraps
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, make_response, request
 from flask_cors import CORS
 
+from src import events
 from src.auth import (
+    HASH_RETRY_AFTER_SECONDS,
+    HashingBusyError,
     admin_required,
     authenticate_user,
     create_user,
     generate_token,
     get_user_by_id,
+    token_cache,
     token_required,
     users,
 )
+from src.events import EventHub, HubFullError
+from src.json_provider import FastJSONProvider, TaskJSONCache
+from src.store import TASK_FIELDS, TIME_FIELDS, create_task_store
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
 # Configuration
 app.config["DEBUG"] = os.getenv("DEBUG", "False") == "True"
 app.config["ENV"] = os.getenv("ENVIRONMENT", "production")
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+MAX_BATCH_OPERATIONS = int(os.getenv("MAX_BATCH_OPERATIONS", "1000"))
 
-# In-memory task storage (replace with database in production)
-tasks = []
-next_id = 1
+# Task storage, selected by STORAGE_BACKEND
+tasks = create_task_store()
+task_json = TaskJSONCache(app.json)
+event_hub = EventHub()
+
+
+def conditional(f):
+    """Answer GETs with 304 Not Modified while the user's tasks are unchanged.
+
+    The strong ETag combines the store's per-user version with the request
+    path and query, so a matching If-None-Match is answered before any task
+    is read or serialised. Must be applied under token_required.
+    """
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        user_id = request.current_user["user_id"]
+        variant = zlib.crc32(request.full_path.encode("utf-8"))
+        etag = f"{tasks.epoch}-{user_id}-{tasks.version(user_id)}-{variant:08x}"
+
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Authorization")
+        return response
+
+    return decorated
 
 
 @app.route("/")
@@ -44,6 +87,10 @@ def index():
                 "get_task": "GET /api/v1/tasks/<id>",
                 "update_task": "PUT /api/v1/tasks/<id>",
                 "delete_task": "DELETE /api/v1/tasks/<id>",
+                "export_tasks": "GET /api/v1/tasks/export",
+                "batch_tasks": "POST /api/v1/tasks/batch",
+                "task_changes": "GET /api/v1/tasks/changes",
+                "task_events": "GET /api/v1/tasks/events",
             },
         }
     )
@@ -52,7 +99,18 @@ def index():
 @app.route("/health")
 def health():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "task-management-api", "tasks_count": len(tasks)}), 200
+    return (
+        jsonify(
+            {
+                "status": "healthy",
+                "service": "task-management-api",
+                "tasks_count": len(tasks),
+                "token_cache": token_cache.stats(),
+                "event_streams": event_hub.stats(),
+            }
+        ),
+        200,
+    )
 
 
 # ============= Authentication Routes =============
@@ -154,12 +212,42 @@ def get_all_users():
     return jsonify({"users": all_users, "total": len(all_users)}), 200
 
 
+def _export_lines(user_ids, status=None, priority=None):
+    """Yield tasks as NDJSON, one chunk per batch of EXPORT_BATCH_SIZE tasks.
+
+    Each batch is fetched with a fresh keyset query, so memory stays constant
+    however many tasks are exported.
+    """
+    for user_id in user_ids:
+        after = None
+        while True:
+            batch = tasks.list(user_id, status=status, priority=priority, after=after, limit=EXPORT_BATCH_SIZE)
+            if not batch:
+                break
+            # Encoded directly: caching a full export would only evict hot entries
+            yield b"\n".join(map(app.json.dumps_bytes, batch)) + b"\n"
+            after = batch[-1]["id"]
+
+
+def _ndjson_response(lines, filename):
+    response = Response(lines, mimetype="application/x-ndjson")
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
+@app.route("/api/v1/admin/tasks/export", methods=["GET"])
+@admin_required
+def export_all_tasks():
+    """Stream every user's tasks as NDJSON (admin only)"""
+    user_ids = [user["id"] for user in users.values()]
+    lines = _export_lines(user_ids, request.args.get("status"), request.args.get("priority"))
+    return _ndjson_response(lines, "tasks.ndjson")
+
+
 @app.route("/api/v1/admin/users/<int:user_id>", methods=["DELETE"])
 @admin_required
 def delete_user(user_id):
     """Delete a user (admin only)"""
-    global tasks
-
     # Prevent admin from deleting themselves
     if user_id == request.current_user["user_id"]:
         return jsonify({"error": "Cannot delete your own admin account"}), 400
@@ -171,12 +259,11 @@ def delete_user(user_id):
     # Prevent deleting the only admin
     user_to_delete = users[user_id]
     if user_to_delete.get("role") == "admin":
-        admin_count = sum(1 for u in users.values() if u.get("role") == "admin")
-        if admin_count <= 1:
+        if users.count_role("admin") <= 1:
             return jsonify({"error": "Cannot delete the only admin user"}), 400
 
     # Delete user's tasks
-    tasks = [t for t in tasks if t.get("user_id") != user_id]
+    tasks.delete_user_tasks(user_id)
 
     # Delete user
     deleted_user = users.pop(user_id)
@@ -201,14 +288,14 @@ def get_user_stats(user_id):
         return jsonify({"error": "User not found"}), 404
 
     user = get_user_by_id(user_id)
-    user_tasks = [t for t in tasks if t.get("user_id") == user_id]
+    counts = tasks.stats(user_id)
 
     stats = {
         "user": user,
-        "total_tasks": len(user_tasks),
-        "pending": len([t for t in user_tasks if t["status"] == "pending"]),
-        "in_progress": len([t for t in user_tasks if t["status"] == "in-progress"]),
-        "completed": len([t for t in user_tasks if t["status"] == "completed"]),
+        "total_tasks": counts["total"],
+        "pending": counts["status"].get("pending", 0),
+        "in_progress": counts["status"].get("in-progress", 0),
+        "completed": counts["status"].get("completed", 0),
     }
 
     return jsonify(stats), 200
@@ -217,32 +304,197 @@ def get_user_stats(user_id):
 # ============= Task Routes (Protected) =============
 
 
-@app.route("/api/v1/tasks", methods=["GET"])
-@token_required
-def get_tasks():
-    """Get all tasks for the current user"""
-    user_id = request.current_user["user_id"]
-    status_filter = request.args.get("status")
-    priority_filter = request.args.get("priority")
+def _int_arg(name, minimum, maximum=None):
+    """Read an optional integer query parameter, raising ValueError if invalid"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    if number < minimum or (maximum is not None and number > maximum):
+        raise ValueError(
+            f"{name} must be between {minimum} and {maximum}" if maximum else f"{name} must be >= {minimum}"
+        )
+    return number
+
+
+def _fields_arg():
+    """Read the optional fields projection, raising ValueError on unknown fields"""
+    value = request.args.get("fields")
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _task_list_response(page, **extra):
+    """Like jsonify({"tasks": page, **extra}), reusing cached task encodings"""
+    if app.json.pretty():
+        return jsonify({"tasks": page, **extra})
+
+    body = b'{"tasks":' + task_json.encode_many(page)
+    if extra:
+        body += b"," + app.json.dumps_bytes(extra)[1:]
+    else:
+        body += b"}"
+    return app.json.raw_response(body)
+
+
+def _time_arg(name):
+    """Read an optional ISO 8601 time parameter as a naive local datetime, raising ValueError if invalid"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 timestamp") from None
+    if moment.tzinfo is not None:
+        # Task times are naive local time, as written by datetime.now()
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _time_ranges_arg():
+    """Read created_after, created_before and updated_since as store time ranges"""
+    created_after = _time_arg("created_after")
+    created_before = _time_arg("created_before")
+    updated_since = _time_arg("updated_since")
+
+    ranges = {}
+    if created_after or created_before:
+        # Ranges include their lower bound; "after" excludes it
+        lower = created_after + timedelta(microseconds=1) if created_after else None
+        ranges["created_at"] = (lower, created_before)
+    if updated_since:
+        ranges["updated_at"] = (updated_since, None)
+    return ranges
+
+
+def _sort_arg():
+    """Read the optional sort parameter as (field, descending)"""
+    value = request.args.get("sort")
+    if value is None:
+        return None
+    field = value.removeprefix("-")
+    if field not in TIME_FIELDS:
+        raise ValueError("sort must be one of created_at, -created_at, updated_at, -updated_at")
+    return field, value.startswith("-")
+
+
+def _time_cursor_arg():
+    """Read the cursor of a time-ordered listing: the last task's time and id joined by "_" """
+    value = request.args.get("cursor")
+    if value is None:
+        return None
+    moment, _, task_id = value.rpartition("_")
+    try:
+        return datetime.fromisoformat(moment), int(task_id)
+    except ValueError:
+        raise ValueError("cursor must be the next_cursor of a previous page") from None
+
+
+def _id_page(user_id, status, priority, limit, cursor):
+    """One page of tasks in creation order; the cursor is the last id returned"""
+    # Fetch one extra task to learn whether another page follows
+    page = tasks.list(user_id, status=status, priority=priority, after=cursor, limit=limit + 1 if limit else None)
+
+    next_cursor = None
+    if limit and len(page) > limit:
+        page = page[:limit]
+        next_cursor = page[-1]["id"]
+
+    total = tasks.count(user_id, status=status, priority=priority) if limit or cursor else len(page)
+    return page, total, next_cursor
+
+
+def _time_page(user_id, status, priority, limit, cursor, sort, ranges):
+    """One page of tasks ordered by sort, or by the filtered time field, within the ranges"""
+    field, descending = sort or (next(iter(ranges)), False)
+    page = tasks.list_by_time(
+        user_id,
+        field,
+        descending,
+        ranges=ranges,
+        status=status,
+        priority=priority,
+        after=cursor,
+        limit=limit + 1 if limit else None,
+    )
 
-    # Filter tasks by user
-    filtered_tasks = [t for t in tasks if t["user_id"] == user_id]
+    next_cursor = None
+    if limit and len(page) > limit:
+        page = page[:limit]
+        next_cursor = f"{page[-1][field]}_{page[-1]['id']}"
 
-    if status_filter:
-        filtered_tasks = [t for t in filtered_tasks if t["status"] == status_filter]
+    total = tasks.count_by_time(user_id, ranges, status=status, priority=priority) if limit or cursor else len(page)
+    return page, total, next_cursor
 
-    if priority_filter:
-        filtered_tasks = [t for t in filtered_tasks if t["priority"] == priority_filter]
 
-    return jsonify({"tasks": filtered_tasks, "total": len(filtered_tasks)}), 200
+def _search_page(user_id, status, priority, limit, cursor, query):
+    """One page of ranked search results; the cursor counts results already returned"""
+    ranked = tasks.search(user_id, query, status=status, priority=priority)
+    start = cursor or 0
+    end = start + limit if limit else len(ranked)
+    next_cursor = end if end < len(ranked) else None
+    return ranked[start:end], len(ranked), next_cursor
+
+
+@app.route("/api/v1/tasks", methods=["GET"])
+@token_required
+@conditional
+def get_tasks():
+    """Get tasks for the current user: filtered, searched with q or sorted, and paginated with limit/cursor"""
+    user_id = request.current_user["user_id"]
+    filters = (request.args.get("status"), request.args.get("priority"))
+    query = request.args.get("q")
+
+    try:
+        limit = _int_arg("limit", 1, MAX_PAGE_SIZE)
+        fields = _fields_arg()
+        sort = _sort_arg()
+        ranges = _time_ranges_arg()
+        if query and (sort or ranges):
+            raise ValueError("q cannot be combined with sort or time filters")
+        cursor = _time_cursor_arg() if sort or ranges else _int_arg("cursor", 0)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    if query:
+        page, total, next_cursor = _search_page(user_id, *filters, limit, cursor, query)
+    elif sort or ranges:
+        page, total, next_cursor = _time_page(user_id, *filters, limit, cursor, sort, ranges)
+    else:
+        page, total, next_cursor = _id_page(user_id, *filters, limit, cursor)
+
+    if fields:
+        page = [{field: task[field] for field in fields} for task in page]
+        return jsonify({"tasks": page, "total": total, "next_cursor": next_cursor}), 200
+
+    return _task_list_response(page, total=total, next_cursor=next_cursor), 200
+
+
+@app.route("/api/v1/tasks/export", methods=["GET"])
+@token_required
+def export_tasks():
+    """Stream the current user's tasks as NDJSON"""
+    user_id = request.current_user["user_id"]
+    lines = _export_lines([user_id], request.args.get("status"), request.args.get("priority"))
+    return _ndjson_response(lines, "tasks.ndjson")
 
 
 @app.route("/api/v1/tasks/<int:task_id>", methods=["GET"])
 @token_required
+@conditional
 def get_task(task_id):
     """Get a specific task"""
     user_id = request.current_user["user_id"]
-    task = next((t for t in tasks if t["id"] == task_id and t["user_id"] == user_id), None)
+    task = tasks.get(task_id, user_id)
 
     if not task:
         return jsonify({"error": "Task not found"}), 404
@@ -254,27 +506,19 @@ def get_task(task_id):
 @token_required
 def create_task():
     """Create a new task"""
-    global next_id
-
     user_id = request.current_user["user_id"]
     data = request.get_json()
 
     if not data or "title" not in data:
         return jsonify({"error": "Title is required"}), 400
 
-    new_task = {
-        "id": next_id,
-        "user_id": user_id,
-        "title": data["title"],
-        "description": data.get("description", ""),
-        "status": data.get("status", "pending"),
-        "priority": data.get("priority", "medium"),
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat(),
-    }
-
-    tasks.append(new_task)
-    next_id += 1
+    new_task = tasks.create(
+        user_id,
+        data["title"],
+        description=data.get("description", ""),
+        status=data.get("status", "pending"),
+        priority=data.get("priority", "medium"),
+    )
 
     return jsonify(new_task), 201
 
@@ -284,23 +528,11 @@ def create_task():
 def update_task(task_id):
     """Update an existing task"""
     user_id = request.current_user["user_id"]
-    task = next((t for t in tasks if t["id"] == task_id and t["user_id"] == user_id), None)
-
-    if not task:
+    if not tasks.get(task_id, user_id):
         return jsonify({"error": "Task not found"}), 404
 
     data = request.get_json()
-
-    if "title" in data:
-        task["title"] = data["title"]
-    if "description" in data:
-        task["description"] = data["description"]
-    if "status" in data:
-        task["status"] = data["status"]
-    if "priority" in data:
-        task["priority"] = data["priority"]
-
-    task["updated_at"] = datetime.now().isoformat()
+    task = tasks.update(task_id, user_id, data)
 
     return jsonify(task), 200
 
@@ -309,42 +541,291 @@ def update_task(task_id):
 @token_required
 def delete_task(task_id):
     """Delete a task"""
-    global tasks
-
     user_id = request.current_user["user_id"]
-    task = next((t for t in tasks if t["id"] == task_id and t["user_id"] == user_id), None)
 
-    if not task:
+    if not tasks.delete(task_id, user_id):
         return jsonify({"error": "Task not found"}), 404
 
-    tasks = [t for t in tasks if t["id"] != task_id]
-
     return jsonify({"message": "Task deleted successfully"}), 200
 
 
+def _check_batch_operation(operation, user_id, deleted):
+    """Return an error result for an operation that cannot be applied, or None.
+
+    deleted holds ids removed by earlier operations of the same batch.
+    """
+    if not isinstance(operation, dict):
+        return {"status": 400, "error": "Operation must be an object"}
+
+    op = operation.get("op")
+    if op == "create":
+        data = operation.get("data")
+        if not isinstance(data, dict) or "title" not in data:
+            return {"status": 400, "error": "Title is required"}
+        return None
+
+    if op not in ("update", "delete"):
+        return {"status": 400, "error": "op must be create, update or delete"}
+    if op == "update" and not isinstance(operation.get("data"), dict):
+        return {"status": 400, "error": "Update data must be an object"}
+
+    task_id = operation.get("id")
+    if not isinstance(task_id, int) or task_id in deleted or not tasks.get(task_id, user_id):
+        return {"status": 404, "error": "Task not found"}
+    return None
+
+
+def _apply_batch_operation(operation, user_id):
+    """Apply a checked operation and return its result"""
+    op = operation["op"]
+    if op == "create":
+        data = operation["data"]
+        task = tasks.create(
+            user_id,
+            data["title"],
+            description=data.get("description", ""),
+            status=data.get("status", "pending"),
+            priority=data.get("priority", "medium"),
+        )
+        return {"status": 201, "task": task}
+    if op == "update":
+        return {"status": 200, "task": tasks.update(operation["id"], user_id, operation["data"])}
+    tasks.delete(operation["id"], user_id)
+    return {"status": 200, "message": "Task deleted successfully"}
+
+
+@app.route("/api/v1/tasks/batch", methods=["POST"])
+@token_required
+def batch_tasks():
+    """Apply several create/update/delete operations in one request.
+
+    Body: {"operations": [{"op": "create", "data": {...}}, {"op": "update", "id": 1, "data": {...}},
+    {"op": "delete", "id": 2}], "atomic": false}. With atomic set, nothing is applied unless
+    every operation is valid.
+    """
+    user_id = request.current_user["user_id"]
+    data = request.get_json()
+    operations = data.get("operations") if isinstance(data, dict) else None
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"error": "operations must be a non-empty list"}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({"error": f"At most {MAX_BATCH_OPERATIONS} operations per batch"}), 400
+
+    with tasks.transaction():
+        if data.get("atomic"):
+            deleted = set()
+            errors = []
+            for operation in operations:
+                errors.append(_check_batch_operation(operation, user_id, deleted))
+                if errors[-1] is None and operation["op"] == "delete":
+                    deleted.add(operation["id"])
+
+            if any(errors):
+                results = [error or {"status": 424, "error": "Not applied"} for error in errors]
+                return jsonify({"error": "Batch rejected, no operations applied", "results": results}), 400
+
+            results = [_apply_batch_operation(operation, user_id) for operation in operations]
+        else:
+            results = [
+                _check_batch_operation(operation, user_id, ()) or _apply_batch_operation(operation, user_id)
+                for operation in operations
+            ]
+
+    return jsonify({"results": results}), 200
+
+
+def _watermark_arg(value):
+    """Split a watermark into (epoch, sequence number), raising ValueError if malformed"""
+    if value is None:
+        return None
+    epoch, _, seq = value.rpartition("-")
+    if not epoch or not seq.isdigit():
+        raise ValueError("since must be the watermark of a previous response")
+    return epoch, int(seq)
+
+
+@app.route("/api/v1/tasks/changes", methods=["GET"])
+@token_required
+@conditional
+def get_task_changes():
+    """List the current user's tasks changed since a watermark, deletions as tombstones.
+
+    Without since, every task is returned. The response watermark is passed
+    as since on the next call; has_more means another call is needed to
+    catch up. 410 means the watermark predates the retained log (or this
+    store) and the client must start again without since.
+    """
+    user_id = request.current_user["user_id"]
+    try:
+        limit = _int_arg("limit", 1, MAX_PAGE_SIZE) or MAX_PAGE_SIZE
+        watermark = _watermark_arg(request.args.get("since"))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    result = None
+    if watermark is None or watermark[0] == tasks.epoch:
+        result = tasks.changes(user_id, watermark and watermark[1], limit + 1)
+    if result is None:
+        return jsonify({"error": "Resync required: watermark too old, fetch changes again without since"}), 410
+
+    version, changes = result
+    has_more = len(changes) > limit
+    if has_more:
+        changes = changes[:limit]
+        version = changes[-1][0]
+
+    entries = [
+        {"id": task_id, "deleted": True} if task is None else {"id": task_id, "deleted": False, "task": task}
+        for _, task_id, task in changes
+    ]
+    return jsonify({"changes": entries, "watermark": f"{tasks.epoch}-{version}", "has_more": has_more}), 200
+
+
+def _sse_message(event, data, event_id=None):
+    """Encode one Server-Sent Events message"""
+    head = f"id: {event_id}\nevent: {event}\n" if event_id else f"event: {event}\n"
+    return head.encode("utf-8") + b"data: " + app.json.dumps_bytes(data) + b"\n\n"
+
+
+class TaskEventStream:
+    """SSE messages for the user's task changes after sequence number since.
+
+    Changes are read from the change log each time the subscription is
+    woken, so bursts coalesce instead of queueing. A stream more than
+    EVENT_MAX_LAG changes behind, or whose position left the log, gets a
+    resync event and ends. Changes made by other workers are picked up at
+    the latest on the next heartbeat.
+
+    Iterating blocks between batches, as WSGI servers expect; the ASGI entry
+    point iterates asynchronously instead, so an idle stream holds no thread.
+    Closing the stream unsubscribes it.
+    """
+
+    def __init__(self, user_id, subscription, since):
+        self.user_id = user_id
+        self.subscription = subscription
+        self.since = since
+        self.finished = False
+        self.caught_up = False
+
+    def _pending(self):
+        """Messages for the changes not sent yet, at most a page of them"""
+        result = None if self.since is None else tasks.changes(self.user_id, self.since, MAX_PAGE_SIZE)
+        if result is None or result[0] - self.since > events.EVENT_MAX_LAG:
+            self.finished = True
+            return [_sse_message("resync", {"error": "Fell behind; fetch /api/v1/tasks/changes again"})]
+
+        version, changes = result
+        messages = []
+        for seq, task_id, task in changes:
+            if task is None:
+                kind, data = "deleted", {"id": task_id}
+            else:
+                kind = "created" if task["created_at"] == task["updated_at"] else "updated"
+                data = {"id": task_id, "task": task}
+            messages.append(_sse_message(kind, data, f"{tasks.epoch}-{seq}"))
+        self.caught_up = len(changes) < MAX_PAGE_SIZE
+        self.since = version if self.caught_up else changes[-1][0]
+        return messages
+
+    def _after_wait(self, woken):
+        if not woken and tasks.version(self.user_id) == self.since:
+            # Comment line: keeps proxies from closing an idle connection
+            return [b": heartbeat\n\n"]
+        return []
+
+    def __iter__(self):
+        yield b"retry: 3000\n\n"
+        while True:
+            yield from self._pending()
+            if self.finished:
+                return
+            if self.caught_up:
+                yield from self._after_wait(self.subscription.wait(events.EVENT_HEARTBEAT_SECONDS))
+
+    async def __aiter__(self):
+        yield b"retry: 3000\n\n"
+        while True:
+            for message in self._pending():
+                yield message
+            if self.finished:
+                return
+            if self.caught_up:
+                for message in self._after_wait(await self.subscription.wait_async(events.EVENT_HEARTBEAT_SECONDS)):
+                    yield message
+
+    def close(self):
+        event_hub.unsubscribe(self.subscription)
+
+
+@app.route("/api/v1/tasks/events", methods=["GET"])
+@token_required
+def task_events():
+    """Stream the current user's task changes as Server-Sent Events.
+
+    Events are created, updated and deleted, each with the task (or its id)
+    as data and a watermark as id. A reconnecting client sends the last id
+    in Last-Event-ID (or as since) to receive what it missed.
+    """
+    user_id = request.current_user["user_id"]
+    try:
+        watermark = _watermark_arg(request.headers.get("Last-Event-ID") or request.args.get("since"))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+    if watermark is None:
+        since = tasks.version(user_id)
+    else:
+        since = watermark[1] if watermark[0] == tasks.epoch else None
+
+    try:
+        subscription = event_hub.subscribe(user_id)
+    except HubFullError:
+        response = jsonify({"error": "Too many event streams, please retry later"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(int(events.EVENT_HEARTBEAT_SECONDS))
+        return response
+
+    # Passed through as is, so servers see the stream's own iteration and close
+    stream = TaskEventStream(user_id, subscription, since)
+    response = Response(stream, mimetype="text/event-stream", direct_passthrough=True)
+    response.headers["Cache-Control"] = "no-cache"
+    # Tell nginx-style proxies not to buffer the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@app.after_request
+def notify_task_streams(response):
+    """Wake the event streams of a user after a successful write to their tasks"""
+    user = getattr(request, "current_user", None)
+    if user and request.method in ("POST", "PUT", "DELETE") and response.status_code < 400:
+        event_hub.publish(user["user_id"])
+    return response
+
+
 @app.route("/api/v1/tasks/stats", methods=["GET"])
 @token_required
+@conditional
 def get_stats():
     """Get task statistics for current user"""
     user_id = request.current_user["user_id"]
-    user_tasks = [t for t in tasks if t["user_id"] == user_id]
-
-    total = len(user_tasks)
-    pending = len([t for t in user_tasks if t["status"] == "pending"])
-    in_progress = len([t for t in user_tasks if t["status"] == "in-progress"])
-    completed = len([t for t in user_tasks if t["status"] == "completed"])
+    counts = tasks.stats(user_id)
+    by_status = counts["status"]
+    by_priority = counts["priority"]
 
     return (
         jsonify(
             {
-                "total": total,
-                "pending": pending,
-                "in_progress": in_progress,
-                "completed": completed,
+                "total": counts["total"],
+                "pending": by_status.get("pending", 0),
+                "in_progress": by_status.get("in-progress", 0),
+                "completed": by_status.get("completed", 0),
                 "by_priority": {
-                    "high": len([t for t in user_tasks if t["priority"] == "high"]),
-                    "medium": len([t for t in user_tasks if t["priority"] == "medium"]),
-                    "low": len([t for t in user_tasks if t["priority"] == "low"]),
+                    "high": by_priority.get("high", 0),
+                    "medium": by_priority.get("medium", 0),
+                    "low": by_priority.get("low", 0),
                 },
             }
         ),
@@ -358,6 +839,15 @@ def not_found(error):
     return jsonify({"error": "Not found"}), 404
 
 
+@app.errorhandler(HashingBusyError)
+def hashing_busy(error):
+    """Shed load when the password hashing pool is saturated"""
+    response = jsonify({"error": "Server is busy, please retry later"})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(HASH_RETRY_AFTER_SECONDS)
+    return response
+
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
@@ -0,0 +1,166 @@
+"""
+ASGI entry point for the API: uvicorn src.asgi:app
+
+The Flask app is served from an event loop. Requests that cannot block run
+on the loop itself; those that can run in a thread pool: password hashing
+(which waits on the bcrypt pool), admin routes and exports, and every
+request when tasks live in SQLite. Event streams are iterated
+asynchronously, so an idle stream is a suspended coroutine, not a thread.
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app import app as flask_app
+from src.store import STORAGE_BACKEND
+
+ASGI_THREADS = int(os.getenv("ASGI_THREADS", "16"))
+# Path prefixes whose requests may block, and so run in the thread pool
+BLOCKING_PATHS = ("/api/v1/auth/register", "/api/v1/auth/login", "/api/v1/admin/", "/api/v1/tasks/export")
+
+
+def _latin1(text):
+    return text.encode("utf-8").decode("latin-1")
+
+
+def wsgi_environ(scope, body):
+    """Build the WSGI environ for an ASGI HTTP request"""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": _latin1(scope.get("root_path", "")),
+        "PATH_INFO": _latin1(scope["path"]),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = scope["client"][0], str(scope["client"][1])
+
+    for name, value in scope.get("headers", ()):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = "HTTP_" + key
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class ASGIAdapter:
+    """Serve a WSGI app to ASGI servers without a thread per request"""
+
+    def __init__(self, wsgi_app, threads=ASGI_THREADS, inline=None):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="asgi")
+        # The in-memory store never waits on I/O, so its requests can share the loop
+        self.inline = STORAGE_BACKEND == "memory" if inline is None else inline
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    def blocks(self, path):
+        """Whether a request to path must leave the event loop"""
+        return not self.inline or path.startswith(BLOCKING_PATHS)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+            return lambda data: None
+
+        environ = wsgi_environ(scope, b"".join(body))
+        blocking = self.blocks(scope["path"])
+        loop = asyncio.get_running_loop()
+        if blocking:
+            app_iter = await loop.run_in_executor(self.executor, self.wsgi_app, environ, start_response)
+        else:
+            app_iter = self.wsgi_app(environ, start_response)
+
+        try:
+            await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+            if hasattr(app_iter, "__aiter__"):
+                finished = await self._stream(app_iter, receive, send)
+            else:
+                await self._send_body(app_iter, send, loop if blocking else None)
+                finished = True
+            if finished:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+    async def _send_body(self, app_iter, send, loop=None):
+        """Send a WSGI body, reading each chunk in the thread pool when loop is given"""
+        chunks = iter(app_iter)
+        while True:
+            if loop is None:
+                chunk = next(chunks, None)
+            else:
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+            if chunk is None:
+                return
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    async def _stream(self, app_iter, receive, send):
+        """Send an asynchronous body until it ends (True) or the client disconnects (False)"""
+
+        async def forward():
+            async for chunk in app_iter:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        streaming = asyncio.ensure_future(forward())
+        watching = asyncio.ensure_future(disconnected())
+        await asyncio.wait((streaming, watching), return_when=asyncio.FIRST_COMPLETED)
+        watching.cancel()
+        if streaming.done():
+            streaming.result()
+            return True
+        streaming.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await streaming
+        return False
+
+
+app = ASGIAdapter(flask_app)
@@ -1,4 +1,8 @@
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import wraps
 
@@ -6,42 +10,73 @@ import bcrypt
 import jwt
 from flask import jsonify, request
 
+from src.store import create_user_store
+
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+# Password hashing: bcrypt releases the GIL, so a small thread pool runs it
+# off the request thread. At most HASH_WORKERS + HASH_QUEUE_SIZE hashes may be
+# running or waiting; beyond that requests are rejected with HashingBusyError.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "8"))
+HASH_RETRY_AFTER_SECONDS = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+
+
+# User storage, selected by STORAGE_BACKEND
+users = create_user_store()
+
 
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE_SIZE)
 
-# In-memory user storage (replace with database in production)
-users = {}
-user_id_counter = 1
+
+class HashingBusyError(Exception):
+    """Raised when the password hashing pool has no free slot."""
+
+
+def _run_hashing(fn, *args):
+    """Run a bcrypt call on the hashing pool and wait for its result."""
+    if not _hash_slots.acquire(blocking=False):
+        raise HashingBusyError()
+
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future.result()
 
 
 def hash_password(password):
     """Hash a password for storing."""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return _run_hashing(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password, hashed_password):
     """Verify a stored password against one provided by user."""
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    return _run_hashing(bcrypt.checkpw, plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
 # Initialize admin user
 def initialize_admin():
     """Create default admin user if no users exist."""
-    global user_id_counter
     if not users:
         admin_user = {
-            "id": user_id_counter,
             "username": "admin",
             "email": "admin@taskmanager.com",
             "password": hash_password("admin@123"),
             "role": "admin",
             "created_at": datetime.now().isoformat(),
         }
-        users[user_id_counter] = admin_user
-        user_id_counter += 1
+        users.add(admin_user)
 
 
 # Initialize admin on module load
@@ -60,16 +95,77 @@ def generate_token(user_id, username, role="user"):
     return jwt.encode(payload, SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
+class TokenCache:
+    """Bounded LRU cache of verified token payloads keyed by the raw token.
+
+    Entries are dropped once the token's exp has passed, and the least
+    recently used entry is evicted when the cache is full. A maxsize of 0
+    disables caching.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        """Return the cached payload for a token, or None"""
+        with self._lock:
+            payload = self._entries.get(token)
+            if payload is None:
+                self.misses += 1
+                return None
+            if payload["exp"] <= time.time():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return payload
+
+    def put(self, token, payload):
+        """Cache a verified payload"""
+        if self.maxsize <= 0 or "exp" not in payload:
+            return
+        with self._lock:
+            self._entries[token] = payload
+            self._entries.move_to_end(token)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+
 def decode_token(token):
     """Decode and verify JWT token."""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
 
+    token_cache.put(token, payload)
+    return payload
+
 
 def token_required(f):
     """Decorator to protect routes that require authentication."""
@@ -139,21 +235,14 @@ def admin_required(f):
 
 def create_user(username, email, password):
     """Create a new user."""
-    global user_id_counter
-
     # Check if username or email already exists
-    for user in users.values():
-        if user["username"] == username:
-            return None, "Username already exists"
-        if user["email"] == email:
-            return None, "Email already exists"
+    if users.get_by_username(username):
+        return None, "Username already exists"
+    if users.email_taken(email):
+        return None, "Email already exists"
 
     # Create new user
-    user_id = user_id_counter
-    user_id_counter += 1
-
     user = {
-        "id": user_id,
         "username": username,
         "email": email,
         "password": hash_password(password),
@@ -161,7 +250,9 @@ def create_user(username, email, password):
         "created_at": datetime.now().isoformat(),
     }
 
-    users[user_id] = user
+    if users.add(user) is None:
+        # Lost a race with a concurrent registration for the same username or email
+        return None, "Username already exists" if users.get_by_username(username) else "Email already exists"
 
     # Return user without password
     safe_user = {k: v for k, v in user.items() if k != "password"}
@@ -171,11 +262,7 @@ def create_user(username, email, password):
 def authenticate_user(username, password):
     """Authenticate user with username and password."""
     # Find user by username
-    user = None
-    for u in users.values():
-        if u["username"] == username:
-            user = u
-            break
+    user = users.get_by_username(username)
 
     if not user:
         return None, "Invalid username or password"
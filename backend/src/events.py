@@ -0,0 +1,114 @@
+"""
+Change notifications for Server-Sent Events streams
+
+The hub only tells a user's open streams that their tasks changed; each
+stream then reads what changed from the task store's change log. Events
+therefore never queue up per client: a slow consumer just reads a larger
+batch next time, and is dropped once it falls too far behind.
+"""
+
+import asyncio
+import os
+import threading
+
+EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", "15"))
+MAX_EVENT_SUBSCRIBERS = int(os.getenv("MAX_EVENT_SUBSCRIBERS", "10000"))
+# Changes a stream may fall behind before it is told to resync and closed
+EVENT_MAX_LAG = int(os.getenv("EVENT_MAX_LAG", "1000"))
+
+
+class HubFullError(Exception):
+    """Raised when MAX_EVENT_SUBSCRIBERS streams are already open"""
+
+
+class Subscription:
+    """One open stream's wake-up flag, awaitable from threads or an event loop"""
+
+    __slots__ = ("user_id", "_wake", "_waiter")
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._wake = threading.Event()
+        self._waiter = None
+
+    def notify(self):
+        self._wake.set()
+        waiter = self._waiter
+        if waiter is not None:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def wait(self, timeout):
+        """Block until notified or timeout seconds pass; returns whether notified"""
+        woken = self._wake.wait(timeout)
+        self._wake.clear()
+        return woken
+
+    async def wait_async(self, timeout):
+        """Like wait, but suspends the calling coroutine instead of blocking"""
+        future = asyncio.get_running_loop().create_future()
+        # Publish the waiter before checking the flag, so a notify in between is not lost
+        self._waiter = (future.get_loop(), future)
+        try:
+            if not self._wake.is_set():
+                await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiter = None
+        woken = self._wake.is_set()
+        self._wake.clear()
+        return woken
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class EventHub:
+    """Open subscriptions grouped by user.
+
+    Publishing wakes only the subscriptions of the user whose tasks changed,
+    so its cost does not grow with the number of idle streams. Waiting
+    subscriptions hold no thread of the hub's own: under a gevent worker
+    each is a parked greenlet, under ASGI a suspended coroutine.
+    """
+
+    def __init__(self, max_subscribers=MAX_EVENT_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._by_user = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def subscribe(self, user_id):
+        """Register a stream for the user's changes, raising HubFullError at capacity"""
+        subscription = Subscription(user_id)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise HubFullError()
+            self._by_user.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._by_user.get(subscription.user_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._by_user[subscription.user_id]
+            self._count -= 1
+
+    def publish(self, user_id):
+        """Wake every stream of a user whose tasks changed"""
+        # Copying the set lets (un)subscribes proceed without the lock here
+        for subscription in tuple(self._by_user.get(user_id, ())):
+            subscription.notify()
+
+    def stats(self):
+        return {"subscribers": self._count, "users": len(self._by_user)}
@@ -0,0 +1,106 @@
+"""
+JSON serialisation for API responses
+
+FastJSONProvider encodes with orjson when it is installed and falls back to
+the standard library otherwise (or for values orjson rejects, such as
+integers wider than 64 bits). Output is compact unless the app runs in debug
+mode, as with Flask's default provider.
+"""
+
+import os
+import threading
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# "orjson" or "stdlib"; orjson is used by default when available
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")
+TASK_JSON_CACHE_SIZE = int(os.getenv("TASK_JSON_CACHE_SIZE", "100000"))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson with a stdlib fallback"""
+
+    use_orjson = orjson is not None and JSON_ENCODER == "orjson"
+
+    def _orjson_options(self, pretty=False):
+        # Hand datetimes and dataclasses to self.default so they render
+        # exactly as the stdlib provider renders them
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, pretty=False):
+        """Serialize data as UTF-8 JSON bytes"""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._orjson_options(pretty))
+            except TypeError:
+                pass
+        dump_args = {"indent": 2} if pretty else {"separators": (",", ":")}
+        return self.dumps(obj, **dump_args).encode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # Let the stdlib decide: it accepts a few inputs orjson does not
+                pass
+        return super().loads(s, **kwargs)
+
+    def pretty(self):
+        """Whether responses should be indented"""
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self.raw_response(self.dumps_bytes(obj, pretty=self.pretty()))
+
+    def raw_response(self, body):
+        """Build a JSON response from already encoded bytes"""
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+class TaskJSONCache:
+    """Encoded task records keyed by task id.
+
+    An entry is reused only while the task's updated_at matches, so any
+    change to a task re-encodes it. The oldest entries are dropped once
+    maxsize is reached.
+    """
+
+    def __init__(self, provider, maxsize=TASK_JSON_CACHE_SIZE):
+        self.provider = provider
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def encode(self, task):
+        """Return the compact JSON encoding of a task"""
+        entry = self._entries.get(task["id"])
+        if entry is not None and entry[0] == task["updated_at"]:
+            return entry[1]
+
+        encoded = self.provider.dumps_bytes(task)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[task["id"]] = (task["updated_at"], encoded)
+                if len(self._entries) > self.maxsize:
+                    del self._entries[next(iter(self._entries))]
+        return encoded
+
+    def encode_many(self, tasks):
+        """Return the tasks as the body of a JSON array"""
+        return b"[" + b",".join(map(self.encode, tasks)) + b"]"
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,542 @@
+"""
+SQLite storage backend for users and tasks
+
+The database runs in WAL mode so readers in other workers never block on a
+writer. Each thread keeps its own connection (reopened after a fork), and all
+statements are constant SQL strings so sqlite3's per-connection statement
+cache prepares each of them only once.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from src.store import CHANGE_LOG_RETENTION, TASK_FIELDS, TIME_FIELDS, TITLE_WEIGHT, UPDATABLE_FIELDS, tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_role ON users (role);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_user ON tasks (user_id);
+CREATE INDEX IF NOT EXISTS tasks_user_status ON tasks (user_id, status);
+CREATE INDEX IF NOT EXISTS tasks_user_priority ON tasks (user_id, priority);
+CREATE INDEX IF NOT EXISTS tasks_user_created ON tasks (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS tasks_user_updated ON tasks (user_id, updated_at, id);
+
+-- Per-user status and priority counts, kept in step with tasks by triggers
+CREATE TABLE IF NOT EXISTS task_counts (
+    user_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, field, value)
+) WITHOUT ROWID;
+
+-- Per-user change counters for ETags; epoch tells databases apart
+CREATE TABLE IF NOT EXISTS task_versions (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+INSERT OR IGNORE INTO meta VALUES ('epoch', lower(hex(randomblob(4))));
+
+
+-- Delta sync: the sequence number (version) of each task's latest change.
+-- Deleted tasks leave tombstones, pruned to the 'change_retention' newest per
+-- user once twice that many pile up; floor is the newest pruned sequence.
+CREATE TABLE IF NOT EXISTS task_changes (
+    user_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS task_changes_seq ON task_changes (user_id, seq);
+CREATE INDEX IF NOT EXISTS task_changes_tombstones ON task_changes (user_id, deleted, seq);
+CREATE TABLE IF NOT EXISTS change_floors (
+    user_id INTEGER PRIMARY KEY,
+    floor INTEGER NOT NULL DEFAULT 0,
+    tombstones INTEGER NOT NULL DEFAULT 0
+);
+
+-- Each change bumps the user's version and logs it under the new version
+CREATE TRIGGER IF NOT EXISTS tasks_changes_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO task_versions VALUES (NEW.user_id, 1) ON CONFLICT DO UPDATE SET version = version + 1;
+    INSERT INTO task_changes VALUES (
+        NEW.user_id, NEW.id, (SELECT version FROM task_versions WHERE user_id = NEW.user_id), 0
+    );
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_changes_update AFTER UPDATE ON tasks BEGIN
+    INSERT INTO task_versions VALUES (NEW.user_id, 1) ON CONFLICT DO UPDATE SET version = version + 1;
+    UPDATE task_changes SET seq = (SELECT version FROM task_versions WHERE user_id = NEW.user_id)
+        WHERE user_id = NEW.user_id AND task_id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_changes_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO task_versions VALUES (OLD.user_id, 1) ON CONFLICT DO UPDATE SET version = version + 1;
+    UPDATE task_changes SET seq = (SELECT version FROM task_versions WHERE user_id = OLD.user_id), deleted = 1
+        WHERE user_id = OLD.user_id AND task_id = OLD.id;
+    INSERT INTO change_floors (user_id, tombstones) VALUES (OLD.user_id, 1)
+        ON CONFLICT DO UPDATE SET tombstones = tombstones + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS change_floors_prune AFTER UPDATE OF tombstones ON change_floors
+WHEN NEW.tombstones > 2 * (SELECT CAST(value AS INTEGER) FROM meta WHERE key = 'change_retention') BEGIN
+    UPDATE change_floors SET
+        floor = max(floor, (
+            SELECT seq FROM task_changes WHERE user_id = NEW.user_id AND deleted = 1 ORDER BY seq DESC
+            LIMIT 1 OFFSET (SELECT CAST(value AS INTEGER) FROM meta WHERE key = 'change_retention')
+        )),
+        tombstones = (SELECT CAST(value AS INTEGER) FROM meta WHERE key = 'change_retention')
+        WHERE user_id = NEW.user_id;
+    DELETE FROM task_changes WHERE user_id = NEW.user_id AND deleted = 1
+        AND seq <= (SELECT floor FROM change_floors WHERE user_id = NEW.user_id);
+END;
+-- Replaced by the tasks_changes_* triggers
+DROP TRIGGER IF EXISTS tasks_version_insert;
+DROP TRIGGER IF EXISTS tasks_version_update;
+DROP TRIGGER IF EXISTS tasks_version_delete;
+
+-- Full-text index over title and description, kept in step by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5 (
+    title, description, content = 'tasks', content_rowid = 'id'
+);
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks
+WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    INSERT INTO tasks_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_counts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO task_counts VALUES (NEW.user_id, 'status', NEW.status, 1)
+        ON CONFLICT DO UPDATE SET count = count + 1;
+    INSERT INTO task_counts VALUES (NEW.user_id, 'priority', NEW.priority, 1)
+        ON CONFLICT DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_counts_delete AFTER DELETE ON tasks BEGIN
+    UPDATE task_counts SET count = count - 1
+        WHERE user_id = OLD.user_id AND field = 'status' AND value = OLD.status;
+    UPDATE task_counts SET count = count - 1
+        WHERE user_id = OLD.user_id AND field = 'priority' AND value = OLD.priority;
+    DELETE FROM task_counts WHERE user_id = OLD.user_id AND count = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_counts_status AFTER UPDATE OF status ON tasks
+WHEN OLD.status IS NOT NEW.status BEGIN
+    UPDATE task_counts SET count = count - 1
+        WHERE user_id = OLD.user_id AND field = 'status' AND value = OLD.status;
+    DELETE FROM task_counts WHERE user_id = OLD.user_id AND count = 0;
+    INSERT INTO task_counts VALUES (NEW.user_id, 'status', NEW.status, 1)
+        ON CONFLICT DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_counts_priority AFTER UPDATE OF priority ON tasks
+WHEN OLD.priority IS NOT NEW.priority BEGIN
+    UPDATE task_counts SET count = count - 1
+        WHERE user_id = OLD.user_id AND field = 'priority' AND value = OLD.priority;
+    DELETE FROM task_counts WHERE user_id = OLD.user_id AND count = 0;
+    INSERT INTO task_counts VALUES (NEW.user_id, 'priority', NEW.priority, 1)
+        ON CONFLICT DO UPDATE SET count = count + 1;
+END;
+"""
+
+INSERT_TASK = (
+    "INSERT INTO tasks (user_id, title, description, status, priority, created_at, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) RETURNING *"
+)
+UPDATE_TASK = (
+    "UPDATE tasks SET "
+    + ", ".join(f"{field} = CASE WHEN :set_{field} THEN :{field} ELSE {field} END" for field in UPDATABLE_FIELDS)
+    + ", updated_at = :updated_at WHERE id = :id AND user_id = :user_id RETURNING *"
+)
+SELECT_TASK = "SELECT * FROM tasks WHERE id = ? AND user_id = ?"
+DELETE_TASK = "DELETE FROM tasks WHERE id = ? AND user_id = ?"
+DELETE_USER_TASKS = "DELETE FROM tasks WHERE user_id = ?"
+# Keyset pagination: "id > ?" seeks in the index, LIMIT -1 means no limit
+LIST_TASKS = "SELECT * FROM tasks WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?"
+LIST_TASKS_BY_STATUS = "SELECT * FROM tasks WHERE user_id = ? AND status = ? AND id > ? ORDER BY id LIMIT ?"
+LIST_TASKS_BY_PRIORITY = "SELECT * FROM tasks WHERE user_id = ? AND priority = ? AND id > ? ORDER BY id LIMIT ?"
+LIST_TASKS_BY_BOTH = (
+    "SELECT * FROM tasks WHERE user_id = ? AND status = ? AND priority = ? AND id > ? ORDER BY id LIMIT ?"
+)
+# Time-ordered listing seeks in the (user_id, <field>, id) index. ISO strings
+# from isoformat() sort like the times they stand for, and the bounds below
+# sort before and after every one of them, so every comparison can use the
+# index and a NULL status or priority matches every task.
+MIN_TIME, MAX_TIME = "", "~"
+TIME_FILTERS = (
+    "user_id = :user_id AND (:status IS NULL OR status = :status) AND (:priority IS NULL OR priority = :priority) "
+    "AND created_at >= :created_at_lower AND created_at < :created_at_upper "
+    "AND updated_at >= :updated_at_lower AND updated_at < :updated_at_upper"
+)
+LIST_TASKS_BY_TIME = {
+    (field, descending): (
+        f"SELECT * FROM tasks WHERE {TIME_FILTERS} AND ({field}, id) {'<' if descending else '>'} (:after, :after_id) "
+        f"ORDER BY {field} {'DESC' if descending else 'ASC'}, id {'DESC' if descending else 'ASC'} LIMIT :limit"
+    )
+    for field in TIME_FIELDS
+    for descending in (False, True)
+}
+COUNT_TASKS_BY_TIME = f"SELECT COUNT(*) FROM tasks WHERE {TIME_FILTERS}"
+# bm25 ranks best first; a NULL filter matches every task
+SEARCH_TASKS = (
+    "SELECT tasks.* FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid "
+    "WHERE tasks_fts MATCH :query AND tasks.user_id = :user_id "
+    "AND (:status IS NULL OR tasks.status = :status) AND (:priority IS NULL OR tasks.priority = :priority) "
+    f"ORDER BY bm25(tasks_fts, {TITLE_WEIGHT}, 1), tasks.id"
+)
+COUNT_TASKS_BY_BOTH = "SELECT COUNT(*) FROM tasks WHERE user_id = ? AND status = ? AND priority = ?"
+SELECT_VERSION = "SELECT version FROM task_versions WHERE user_id = ?"
+SELECT_FLOOR = "SELECT floor FROM change_floors WHERE user_id = ?"
+# Changed tasks (NULL columns for tombstones) in sequence order
+LIST_CHANGES = (
+    "SELECT task_changes.seq, task_changes.task_id, task_changes.deleted, tasks.* FROM task_changes "
+    "LEFT JOIN tasks ON tasks.id = task_changes.task_id "
+    "WHERE task_changes.user_id = ? AND task_changes.seq > ? AND task_changes.seq <= ? "
+    "ORDER BY task_changes.seq LIMIT ?"
+)
+SELECT_COUNTS = "SELECT field, value, count FROM task_counts WHERE user_id = ?"
+SELECT_COUNT = "SELECT count FROM task_counts WHERE user_id = ? AND field = ? AND value = ?"
+
+INSERT_USER = "INSERT INTO users (username, email, password, role, created_at) VALUES (?, ?, ?, ?, ?) RETURNING id"
+SELECT_USER = "SELECT * FROM users WHERE id = ?"
+SELECT_USER_BY_USERNAME = "SELECT * FROM users WHERE username = ?"
+DELETE_USER = "DELETE FROM users WHERE id = ? RETURNING *"
+
+
+class SQLiteDatabase:
+    """Per-thread SQLite connections to one database file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self.connection()
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        conn.executescript(SCHEMA)
+        if "tasks_fts" not in existing:
+            # Index tasks stored before the full-text index existed
+            conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+        if "task_changes" not in existing:
+            # Log tasks stored before the change log existed as of the current version
+            conn.execute(
+                "INSERT OR IGNORE INTO task_changes "
+                "SELECT tasks.user_id, tasks.id, version, 0 FROM tasks JOIN task_versions USING (user_id)"
+            )
+        conn.execute(
+            "INSERT INTO meta VALUES ('change_retention', ?) ON CONFLICT DO UPDATE SET value = excluded.value",
+            (CHANGE_LOG_RETENTION,),
+        )
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is None or local.pid != os.getpid():
+            # isolation_level=None: every statement commits on its own, and
+            # each write below is a single statement
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            local.conn = conn
+            local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run the enclosed statements in one write transaction"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    # Results are always read to the end so the statement is reset at once
+    # and does not keep a transaction open (RETURNING writes included)
+
+    def fetch_one(self, sql, params=()):
+        rows = self.execute(sql, params).fetchall()
+        return dict(rows[0]) if rows else None
+
+    def scalar(self, sql, params=()):
+        rows = self.execute(sql, params).fetchall()
+        return rows[0][0] if rows else None
+
+    def fetch_all(self, sql, params=()):
+        return [dict(row) for row in self.execute(sql, params)]
+
+
+class SQLiteTaskStore:
+    """Task storage in SQLite with the same interface as TaskStore"""
+
+    def __init__(self, path):
+        self.db = SQLiteDatabase(path)
+        self.epoch = self.db.scalar("SELECT value FROM meta WHERE key = 'epoch'")
+
+    def __len__(self):
+        return self.db.scalar("SELECT COUNT(*) FROM tasks")
+
+    def clear(self):
+        """Remove all tasks and restart id allocation"""
+        conn = self.db.connection()
+        conn.execute("DELETE FROM tasks")
+        conn.execute("DELETE FROM task_counts")
+        conn.execute("DELETE FROM task_versions")
+        conn.execute("DELETE FROM task_changes")
+        conn.execute("DELETE FROM change_floors")
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+        conn.execute("UPDATE meta SET value = lower(hex(randomblob(4))) WHERE key = 'epoch'")
+        self.epoch = self.db.scalar("SELECT value FROM meta WHERE key = 'epoch'")
+
+    def version(self, user_id):
+        """Counter bumped by every change to the user's tasks"""
+        return self.db.scalar(SELECT_VERSION, (user_id,)) or 0
+
+    def transaction(self):
+        """Group several operations into one SQLite transaction"""
+        return self.db.transaction()
+
+    def create(self, user_id, title, description="", status="pending", priority="medium"):
+        """Create a task and return it"""
+        now = datetime.now().isoformat()
+        return self.db.fetch_one(INSERT_TASK, (user_id, title, description, status, priority, now, now))
+
+    def get(self, task_id, user_id):
+        """Get a task owned by the given user, or None"""
+        return self.db.fetch_one(SELECT_TASK, (task_id, user_id))
+
+    def update(self, task_id, user_id, changes):
+        """Apply the updatable fields in changes to a task and return it, or None"""
+        params = {"id": task_id, "user_id": user_id, "updated_at": datetime.now().isoformat()}
+        for field in UPDATABLE_FIELDS:
+            params[f"set_{field}"] = field in changes
+            params[field] = changes.get(field)
+        return self.db.fetch_one(UPDATE_TASK, params)
+
+    def delete(self, task_id, user_id):
+        """Delete a task owned by the given user, returning whether it existed"""
+        return self.db.execute(DELETE_TASK, (task_id, user_id)).rowcount > 0
+
+    def delete_user_tasks(self, user_id):
+        """Delete every task owned by a user, returning how many were removed"""
+        with self.db.transaction() as conn:
+            removed = conn.execute(DELETE_USER_TASKS, (user_id,)).rowcount
+            # Drop the user's log; every earlier watermark now needs a resync
+            conn.execute("DELETE FROM task_changes WHERE user_id = ?", (user_id,))
+            conn.execute(
+                "INSERT INTO change_floors (user_id, floor) VALUES (?, ?) "
+                "ON CONFLICT DO UPDATE SET floor = excluded.floor, tombstones = 0",
+                (user_id, self.version(user_id)),
+            )
+        return removed
+
+    def changes(self, user_id, since=None, limit=None):
+        """The user's version and the tasks changed after sequence number since.
+
+        Returns (version, changes) as TaskStore.changes does, or None when
+        since is older than the retained log.
+        """
+        version = self.version(user_id)
+        rows = self.db.execute(LIST_CHANGES, (user_id, since or 0, version, -1 if limit is None else limit)).fetchall()
+        # Read after the changes, so tombstones pruned meanwhile are noticed
+        floor = self.db.scalar(SELECT_FLOOR, (user_id,)) or 0
+        if since is not None and (since < floor or since > version):
+            return None
+        return version, [
+            (row["seq"], row["task_id"], None if row["deleted"] else {field: row[field] for field in TASK_FIELDS})
+            for row in rows
+        ]
+
+    def list(self, user_id, status=None, priority=None, after=None, limit=None):
+        """List a user's tasks in creation order, optionally filtered and paged by id"""
+        page = (after or 0, -1 if limit is None else limit)
+        if status and priority:
+            return self.db.fetch_all(LIST_TASKS_BY_BOTH, (user_id, status, priority, *page))
+        if status:
+            return self.db.fetch_all(LIST_TASKS_BY_STATUS, (user_id, status, *page))
+        if priority:
+            return self.db.fetch_all(LIST_TASKS_BY_PRIORITY, (user_id, priority, *page))
+        return self.db.fetch_all(LIST_TASKS, (user_id, *page))
+
+    def list_by_time(
+        self, user_id, field, descending=False, ranges=None, status=None, priority=None, after=None, limit=None
+    ):
+        """List a user's tasks ordered by created_at or updated_at, then id, within the time ranges"""
+        params = _time_params(user_id, ranges, status, priority)
+        if after is None:
+            params["after"], params["after_id"] = (MAX_TIME, 0) if descending else (MIN_TIME, 0)
+        else:
+            params["after"], params["after_id"] = after[0].isoformat(), after[1]
+        params["limit"] = -1 if limit is None else limit
+        return self.db.fetch_all(LIST_TASKS_BY_TIME[field, descending], params)
+
+    def count_by_time(self, user_id, ranges, status=None, priority=None):
+        """Count a user's tasks within the time ranges and filters"""
+        return self.db.scalar(COUNT_TASKS_BY_TIME, _time_params(user_id, ranges, status, priority))
+
+    def search(self, user_id, query, status=None, priority=None):
+        """List a user's tasks matching every word of query, most relevant first"""
+        words = dict.fromkeys(tokenize(query))
+        if not words:
+            return []
+        # Quoted prefix queries, so no user input is read as FTS5 syntax
+        match = " ".join(f'"{word}"*' for word in words)
+        params = {"query": match, "user_id": user_id, "status": status or None, "priority": priority or None}
+        return self.db.fetch_all(SEARCH_TASKS, params)
+
+    def count(self, user_id, status=None, priority=None):
+        """Count a user's tasks matching the filters without listing them"""
+        if status and priority:
+            return self.db.scalar(COUNT_TASKS_BY_BOTH, (user_id, status, priority))
+        if status:
+            return self.db.scalar(SELECT_COUNT, (user_id, "status", status)) or 0
+        if priority:
+            return self.db.scalar(SELECT_COUNT, (user_id, "priority", priority)) or 0
+        return self.stats(user_id)["total"]
+
+    def stats(self, user_id):
+        """Count a user's tasks in total, by status and by priority"""
+        counts = {"total": 0, "status": {}, "priority": {}}
+        for field, value, count in self.db.execute(SELECT_COUNTS, (user_id,)).fetchall():
+            counts[field][value] = count
+        counts["total"] = sum(counts["status"].values())
+        return counts
+
+    def check_consistency(self):
+        """Compare the trigger-maintained counts, change log and search index with the tasks"""
+        recount = self.db.execute(
+            "SELECT user_id, 'status', status, COUNT(*) FROM tasks GROUP BY user_id, status "
+            "UNION ALL SELECT user_id, 'priority', priority, COUNT(*) FROM tasks GROUP BY user_id, priority"
+        ).fetchall()
+        stored = self.db.execute("SELECT user_id, field, value, count FROM task_counts").fetchall()
+
+        expected = {tuple(row[:3]): row[3] for row in recount}
+        actual = {tuple(row[:3]): row[3] for row in stored}
+        problems = [
+            f"user {key[0]} {key[1]}={key[2]}: counted {actual.get(key)}, stored {expected.get(key)}"
+            for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        ]
+
+        unlogged = self.db.scalar(
+            "SELECT COUNT(*) FROM tasks LEFT JOIN task_changes ON task_changes.task_id = tasks.id "
+            "AND task_changes.user_id = tasks.user_id WHERE task_changes.seq IS NULL OR task_changes.deleted"
+        )
+        if unlogged:
+            problems.append(f"change log: {unlogged} tasks missing")
+
+        try:
+            # rank 1 also compares the full-text index with the tasks table
+            self.db.execute("INSERT INTO tasks_fts (tasks_fts, rank) VALUES ('integrity-check', 1)")
+        except sqlite3.DatabaseError as error:
+            problems.append(f"full-text index: {error}")
+        return problems
+
+
+def _time_params(user_id, ranges, status, priority):
+    params = {"user_id": user_id, "status": status or None, "priority": priority or None}
+    for field in TIME_FIELDS:
+        lower, upper = (ranges or {}).get(field, (None, None))
+        params[f"{field}_lower"] = MIN_TIME if lower is None else lower.isoformat()
+        params[f"{field}_upper"] = MAX_TIME if upper is None else upper.isoformat()
+    return params
+
+
+class SQLiteUserStore:
+    """User storage in SQLite with the same interface as UserStore"""
+
+    def __init__(self, path):
+        self.db = SQLiteDatabase(path)
+
+    def __len__(self):
+        return self.db.scalar("SELECT COUNT(*) FROM users")
+
+    def __contains__(self, user_id):
+        return self.db.scalar("SELECT 1 FROM users WHERE id = ?", (user_id,)) is not None
+
+    def __getitem__(self, user_id):
+        user = self.get(user_id)
+        if user is None:
+            raise KeyError(user_id)
+        return user
+
+    def get(self, user_id):
+        """Get a user by id, or None"""
+        return self.db.fetch_one(SELECT_USER, (user_id,))
+
+    def values(self):
+        """All users in creation order"""
+        return self.db.fetch_all("SELECT * FROM users ORDER BY id")
+
+    def clear(self):
+        """Remove all users"""
+        conn = self.db.connection()
+        conn.execute("DELETE FROM users")
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'users'")
+
+    def add(self, user):
+        """Assign an id to a new user and store it.
+
+        Returns the stored user, or None if the username or email is taken.
+        """
+        params = (user["username"], user["email"], user["password"], user["role"], user["created_at"])
+        try:
+            user["id"] = self.db.scalar(INSERT_USER, params)
+        except sqlite3.IntegrityError:
+            return None
+        return user
+
+    def pop(self, user_id):
+        """Remove a user by id and return it"""
+        user = self.db.fetch_one(DELETE_USER, (user_id,))
+        if user is None:
+            raise KeyError(user_id)
+        return user
+
+    def get_by_username(self, username):
+        """Get a user by username, or None"""
+        return self.db.fetch_one(SELECT_USER_BY_USERNAME, (username,))
+
+    def email_taken(self, email):
+        """Whether a user with this email exists"""
+        return self.db.scalar("SELECT 1 FROM users WHERE email = ?", (email,)) is not None
+
+    def count_role(self, role):
+        """Number of users with the given role"""
+        return self.db.scalar("SELECT COUNT(*) FROM users WHERE role = ?", (role,))
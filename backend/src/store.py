@@ -0,0 +1,823 @@
+"""
+In-memory storage with indexed lookups
+"""
+
+import math
+import os
+import re
+import secrets
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import count, islice
+
+TASK_FIELDS = ("id", "user_id", "title", "description", "status", "priority", "created_at", "updated_at")
+UPDATABLE_FIELDS = ("title", "description", "status", "priority")
+TIME_FIELDS = ("created_at", "updated_at")
+
+# Storage backend: "memory" keeps everything in this process, "sqlite" stores
+# users and tasks in DATABASE_PATH so several workers can share them
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+DATABASE_PATH = os.getenv("DATABASE_PATH", "tasks.db")
+# Delete tombstones kept per user for delta sync; older watermarks must resync
+CHANGE_LOG_RETENTION = int(os.getenv("CHANGE_LOG_RETENTION", "10000"))
+
+# Search terms are runs of letters and digits, as in SQLite's unicode61 tokenizer
+TERM_PATTERN = re.compile(r"[^\W_]+")
+# A term in the title counts this many times a description term
+TITLE_WEIGHT = 2
+# Share of a term's score earned by a query word that is only its prefix
+PREFIX_WEIGHT = 0.5
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(moment):
+    """Microseconds since 1970 for a naive local datetime, ordered like its ISO string"""
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def tokenize(text):
+    """Split text into lowercase search terms"""
+    if not text:
+        return []
+    return TERM_PATTERN.findall(str(text).casefold())
+
+
+class IdIndex:
+    """Ascending set of task ids.
+
+    Ids live in a sorted list so iteration follows creation order. Removing an
+    id only drops it from the live set; stale list entries are skipped while
+    iterating and purged once they outnumber the live ones.
+    """
+
+    __slots__ = ("_ids", "_live")
+
+    def __init__(self):
+        self._ids = []
+        self._live = set()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, task_id):
+        return task_id in self._live
+
+    def __iter__(self):
+        live = self._live
+        return (task_id for task_id in self._ids if task_id in live)
+
+    def iter_after(self, task_id):
+        """Iterate ids greater than task_id in ascending order"""
+        live = self._live
+        ids = self._ids
+        return (ids[i] for i in range(bisect_right(ids, task_id), len(ids)) if ids[i] in live)
+
+    def add(self, task_id):
+        """Add an id, keeping the list sorted"""
+        if task_id in self._live:
+            return
+        self._live.add(task_id)
+
+        ids = self._ids
+        if not ids or ids[-1] < task_id:
+            # New tasks always carry the highest id, so this is the common path
+            ids.append(task_id)
+            return
+
+        pos = bisect_left(ids, task_id)
+        if ids[pos] != task_id:
+            ids.insert(pos, task_id)
+
+    def discard(self, task_id):
+        """Remove an id if present"""
+        live = self._live
+        if task_id not in live:
+            return
+        live.remove(task_id)
+
+        if len(self._ids) > 2 * len(live) + 64:
+            self._ids = [i for i in self._ids if i in live]
+
+
+class TimeIndex:
+    """Task ids ordered by an integer timestamp (then id).
+
+    Keys and ids are parallel sorted lists, so a time range is located by
+    bisect and read in either direction. Each task's current key is kept in
+    a dict: moving a task (on update) appends a new entry and leaves the old
+    one stale, to be skipped while iterating and purged once stale entries
+    outnumber the live ones.
+    """
+
+    __slots__ = ("_keys", "_ids", "_current")
+
+    def __init__(self):
+        self._keys = []
+        self._ids = []
+        self._current = {}
+
+    def __len__(self):
+        return len(self._current)
+
+    def key(self, task_id):
+        """The task's timestamp, or None if it is not indexed"""
+        return self._current.get(task_id)
+
+    def add(self, task_id, key):
+        """Index a task at key, replacing its previous position"""
+        if self._current.get(task_id) == key:
+            return
+        self._current[task_id] = key
+
+        keys, ids = self._keys, self._ids
+        if not keys or (keys[-1], ids[-1]) < (key, task_id):
+            # New and just-updated tasks carry the latest time
+            keys.append(key)
+            ids.append(task_id)
+        else:
+            pos = self._locate(key, task_id)
+            if pos and keys[pos - 1] == key and ids[pos - 1] == task_id:
+                # A stale entry for the same position becomes live again
+                return
+            keys.insert(pos, key)
+            ids.insert(pos, task_id)
+        self._compact()
+
+    def discard(self, task_id):
+        """Remove a task if present"""
+        if self._current.pop(task_id, None) is not None:
+            self._compact()
+
+    def between(self, lower=None, upper=None, descending=False, after=None):
+        """Iterate ids with lower <= key < upper, ascending or descending.
+
+        after is a (key, id) position to resume from: only entries past it
+        in the iteration order are returned.
+        """
+        keys, ids, current = self._keys, self._ids, self._current
+        start = 0 if lower is None else bisect_left(keys, lower)
+        end = len(keys) if upper is None else bisect_left(keys, upper)
+        if after is not None and descending:
+            end = min(end, self._locate(*after, right=False))
+        elif after is not None:
+            start = max(start, self._locate(*after))
+
+        positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+        return (ids[i] for i in positions if current.get(ids[i]) == keys[i])
+
+    def _locate(self, key, task_id, right=True):
+        """Position of (key, task_id) in the sorted entries, as bisect_right/left would give"""
+        keys = self._keys
+        hi = bisect_right(keys, key)
+        lo = bisect_left(keys, key, 0, hi)
+        # Entries sharing a key are ordered by id
+        find = bisect_right if right else bisect_left
+        return find(self._ids, task_id, lo, hi)
+
+    def _compact(self):
+        current = self._current
+        if len(self._keys) > 2 * len(current) + 64:
+            live = [(k, i) for k, i in zip(self._keys, self._ids) if current.get(i) == k]
+            self._keys = [k for k, _ in live]
+            self._ids = [i for _, i in live]
+
+
+class ChangeLog:
+    """Sequence number of the latest change to each of one user's tasks.
+
+    Sequence numbers are the user's version after each change, so entries
+    arrive in ascending order and are appended. A task changed again leaves
+    its older entry stale, to be skipped and eventually purged. A deleted
+    task keeps a tombstone entry until more than retention tombstones pile
+    up; the oldest are then dropped and floor rises to the newest dropped
+    sequence number, at or below which changes can no longer be listed.
+    """
+
+    __slots__ = ("_seqs", "_ids", "_latest", "_tombstones", "retention", "floor")
+
+    def __init__(self, retention=None):
+        self._seqs = []
+        self._ids = []
+        self._latest = {}
+        self._tombstones = deque()
+        self.retention = CHANGE_LOG_RETENTION if retention is None else retention
+        self.floor = 0
+
+    def record(self, task_id, seq, deleted=False):
+        """Note that a task was created, updated or (if deleted) removed at seq"""
+        self._latest[task_id] = seq
+        self._seqs.append(seq)
+        self._ids.append(task_id)
+        if deleted:
+            tombstones = self._tombstones
+            tombstones.append((seq, task_id))
+            while len(tombstones) > self.retention:
+                seq, task_id = tombstones.popleft()
+                # Task ids are never reused, so a tombstone stays the latest entry
+                del self._latest[task_id]
+                self.floor = seq
+
+        if len(self._seqs) > 2 * len(self._latest) + 64:
+            live = [(s, i) for s, i in zip(self._seqs, self._ids) if self._latest.get(i) == s]
+            self._seqs = [s for s, _ in live]
+            self._ids = [i for _, i in live]
+
+    def since(self, after, upto):
+        """Iterate (seq, task_id) of the latest changes with after < seq <= upto"""
+        seqs, ids, latest = self._seqs, self._ids, self._latest
+        start = bisect_right(seqs, after)
+        end = bisect_right(seqs, upto, start)
+        return ((seqs[i], ids[i]) for i in range(start, end) if latest.get(ids[i]) == seqs[i])
+
+    def entries(self):
+        """{task_id: seq} of the latest change to every task still logged"""
+        return self._latest
+
+
+class SearchIndex:
+    """Inverted index from search terms to the tasks containing them.
+
+    postings maps each term to {task_id: weight}, the weight counting the
+    term's occurrences with title ones multiplied by TITLE_WEIGHT. The terms
+    are also kept sorted, so the terms starting with a prefix form one slice.
+    """
+
+    __slots__ = ("postings", "terms")
+
+    def __init__(self):
+        self.postings = {}
+        self.terms = []
+
+    def add(self, task_id, title, description):
+        for term, weight in _term_weights(title, description).items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                insort(self.terms, term)
+            postings[task_id] = weight
+
+    def remove(self, task_id, title, description):
+        for term in _term_weights(title, description):
+            postings = self.postings[term]
+            del postings[task_id]
+            if not postings:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+
+    def expand(self, prefix):
+        """Indexed terms starting with prefix"""
+        terms = self.terms
+        start = bisect_left(terms, prefix)
+        end = bisect_left(terms, prefix + "\U0010ffff", start)
+        return terms[start:end]
+
+    def search(self, query, total):
+        """Score the tasks matching every word of query as a term or prefix.
+
+        A term contributes weight * log(1 + total / document frequency), so
+        rare terms outweigh common ones. Returns {task_id: score}.
+        """
+        words = []
+        for word in dict.fromkeys(tokenize(query)):
+            terms = self.expand(word)
+            if not terms:
+                return {}
+            words.append((sum(len(self.postings[term]) for term in terms), word, terms))
+
+        # Start from the most selective word; later words only rescore its matches
+        scores = None
+        for _, word, terms in sorted(words):
+            scores = self._score(word, terms, total, scores)
+            if not scores:
+                return {}
+        return scores or {}
+
+    def _score(self, word, terms, total, candidates):
+        matched = {}
+        for term in terms:
+            postings = self.postings[term]
+            idf = math.log(1 + total / len(postings))
+            if term != word:
+                idf *= PREFIX_WEIGHT
+            if candidates is None:
+                for task_id, weight in postings.items():
+                    matched[task_id] = matched.get(task_id, 0.0) + weight * idf
+            else:
+                for task_id in candidates.keys() & postings.keys():
+                    matched[task_id] = matched.get(task_id, 0.0) + postings[task_id] * idf
+        if candidates is not None:
+            for task_id, score in matched.items():
+                matched[task_id] = score + candidates[task_id]
+        return matched
+
+
+def _term_weights(title, description):
+    weights = {}
+    for term in tokenize(title):
+        weights[term] = weights.get(term, 0) + TITLE_WEIGHT
+    for term in tokenize(description):
+        weights[term] = weights.get(term, 0) + 1
+    return weights
+
+
+class _UserTasks:
+    """Secondary indexes over the tasks of a single user"""
+
+    __slots__ = ("all", "by_status", "by_priority", "text", "by_time")
+
+    def __init__(self):
+        self.all = IdIndex()
+        self.by_status = {}
+        self.by_priority = {}
+        self.text = SearchIndex()
+        self.by_time = {field: TimeIndex() for field in TIME_FIELDS}
+
+    def add(self, task, created, updated):
+        """Index a task; created and updated are its timestamps from to_micros"""
+        task_id = task["id"]
+        self.all.add(task_id)
+        _bucket(self.by_status, task["status"]).add(task_id)
+        _bucket(self.by_priority, task["priority"]).add(task_id)
+        self.text.add(task_id, task["title"], task["description"])
+        self.by_time["created_at"].add(task_id, created)
+        self.by_time["updated_at"].add(task_id, updated)
+
+    def remove(self, task):
+        task_id = task["id"]
+        self.all.discard(task_id)
+        _unbucket(self.by_status, task["status"], task_id)
+        _unbucket(self.by_priority, task["priority"], task_id)
+        self.text.remove(task_id, task["title"], task["description"])
+        for index in self.by_time.values():
+            index.discard(task_id)
+
+    def reindex(self, task, old, updated):
+        """Move a task to the indexes matching its new fields.
+
+        old holds the task's updatable fields before the change; indexes are
+        only touched for fields whose value changed. updated is the new
+        updated_at timestamp.
+        """
+        task_id = task["id"]
+        self.by_time["updated_at"].add(task_id, updated)
+        if task["status"] != old["status"]:
+            _unbucket(self.by_status, old["status"], task_id)
+            _bucket(self.by_status, task["status"]).add(task_id)
+        if task["priority"] != old["priority"]:
+            _unbucket(self.by_priority, old["priority"], task_id)
+            _bucket(self.by_priority, task["priority"]).add(task_id)
+        if task["title"] != old["title"] or task["description"] != old["description"]:
+            self.text.remove(task_id, old["title"], old["description"])
+            self.text.add(task_id, task["title"], task["description"])
+
+    def stats(self):
+        return {
+            "total": len(self.all),
+            "status": {status: len(bucket) for status, bucket in self.by_status.items()},
+            "priority": {priority: len(bucket) for priority, bucket in self.by_priority.items()},
+        }
+
+
+def _bucket(index, key):
+    bucket = index.get(key)
+    if bucket is None:
+        bucket = index[key] = IdIndex()
+    return bucket
+
+
+def _unbucket(index, key, task_id):
+    bucket = index.get(key)
+    if bucket is not None:
+        bucket.discard(task_id)
+        if not bucket:
+            del index[key]
+
+
+class TaskStore:
+    """Task storage indexed by id, user, (user, status) and (user, priority).
+
+    Every operation touches a constant number of dict and set entries, so its
+    cost does not depend on how many tasks the store holds. The status and
+    priority buckets double as per-user counters: their sizes change exactly
+    when a task enters or leaves them.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._users = {}
+        self._versions = {}
+        self._changes = {}
+        self._ids = count(1)
+        # Distinguishes versions handed out by different store instances
+        self.epoch = secrets.token_hex(4)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def clear(self):
+        """Remove all tasks and restart id allocation"""
+        self._tasks.clear()
+        self._users.clear()
+        self._versions.clear()
+        self._changes.clear()
+        self._ids = count(1)
+        self.epoch = secrets.token_hex(4)
+
+    def version(self, user_id):
+        """Counter bumped by every change to the user's tasks"""
+        return self._versions.get(user_id, 0)
+
+    def _bump(self, user_id, task_id=None, deleted=False):
+        version = self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        if task_id is not None:
+            log = self._changes.get(user_id)
+            if log is None:
+                log = self._changes[user_id] = ChangeLog()
+            log.record(task_id, version, deleted)
+
+    def changes(self, user_id, since=None, limit=None):
+        """The user's version and the tasks changed after sequence number since.
+
+        Returns (version, changes), each change being (seq, task_id, task)
+        with task None for deleted tasks, in sequence order and at most limit
+        of them. Returns None when since is older than the retained log; with
+        since None every retained change is listed.
+        """
+        version = self.version(user_id)
+        log = self._changes.get(user_id)
+        floor = log.floor if log is not None else version
+        if since is not None and (since < floor or since > version):
+            return None
+        if log is None:
+            return version, []
+
+        tasks = self._tasks
+        entries = islice(log.since(since or 0, version), limit)
+        return version, [(seq, task_id, tasks.get(task_id)) for seq, task_id in entries]
+
+    @contextmanager
+    def transaction(self):
+        """Group several operations; the in-memory store applies each directly"""
+        yield
+
+    def create(self, user_id, title, description="", status="pending", priority="medium"):
+        """Create a task and return it"""
+        moment = datetime.now()
+        now = moment.isoformat()
+        task = {
+            "id": next(self._ids),
+            "user_id": user_id,
+            "title": title,
+            "description": description,
+            "status": status,
+            "priority": priority,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        self._tasks[task["id"]] = task
+        user_tasks = self._users.get(user_id)
+        if user_tasks is None:
+            user_tasks = self._users[user_id] = _UserTasks()
+        stamp = to_micros(moment)
+        user_tasks.add(task, stamp, stamp)
+        self._bump(user_id, task["id"])
+
+        return task
+
+    def get(self, task_id, user_id):
+        """Get a task owned by the given user, or None"""
+        task = self._tasks.get(task_id)
+        if task is None or task["user_id"] != user_id:
+            return None
+        return task
+
+    def update(self, task_id, user_id, changes):
+        """Apply the updatable fields in changes to a task and return it, or None"""
+        task = self.get(task_id, user_id)
+        if task is None:
+            return None
+
+        old = {field: task[field] for field in UPDATABLE_FIELDS}
+        for field in UPDATABLE_FIELDS:
+            if field in changes:
+                task[field] = changes[field]
+        moment = datetime.now()
+        task["updated_at"] = moment.isoformat()
+        self._users[user_id].reindex(task, old, to_micros(moment))
+        self._bump(user_id, task_id)
+
+        return task
+
+    def delete(self, task_id, user_id):
+        """Delete a task owned by the given user, returning whether it existed.
+
+        Only the task's own index entries are touched; nothing is copied.
+        """
+        task = self.get(task_id, user_id)
+        if task is None:
+            return False
+
+        del self._tasks[task_id]
+        user_tasks = self._users[user_id]
+        user_tasks.remove(task)
+        if not user_tasks.all:
+            del self._users[user_id]
+        self._bump(user_id, task_id, deleted=True)
+
+        return True
+
+    def delete_user_tasks(self, user_id):
+        """Delete every task owned by a user, returning how many were removed.
+
+        Costs O(k) for the user's k tasks; other users' tasks are not visited.
+        """
+        user_tasks = self._users.pop(user_id, None)
+        if user_tasks is None:
+            return 0
+
+        for task_id in user_tasks.all:
+            del self._tasks[task_id]
+        self._bump(user_id)
+        # Without a log every earlier watermark of this user needs a resync
+        self._changes.pop(user_id, None)
+
+        return len(user_tasks.all)
+
+    def list(self, user_id, status=None, priority=None, after=None, limit=None):
+        """List a user's tasks in creation order, optionally filtered.
+
+        after and limit page through the result by task id: only tasks with
+        an id greater than after are returned, at most limit of them.
+        """
+        user_tasks = self._users.get(user_id)
+        if user_tasks is None:
+            return []
+
+        after = after or 0
+        if status and priority:
+            by_status = user_tasks.by_status.get(status, IdIndex())
+            by_priority = user_tasks.by_priority.get(priority, IdIndex())
+            if len(by_status) <= len(by_priority):
+                ids = (i for i in by_status.iter_after(after) if i in by_priority)
+            else:
+                ids = (i for i in by_priority.iter_after(after) if i in by_status)
+        elif status:
+            ids = user_tasks.by_status.get(status, IdIndex()).iter_after(after)
+        elif priority:
+            ids = user_tasks.by_priority.get(priority, IdIndex()).iter_after(after)
+        else:
+            ids = user_tasks.all.iter_after(after)
+
+        tasks = self._tasks
+        return [tasks[task_id] for task_id in islice(ids, limit)]
+
+    def list_by_time(
+        self, user_id, field, descending=False, ranges=None, status=None, priority=None, after=None, limit=None
+    ):
+        """List a user's tasks ordered by created_at or updated_at, then id.
+
+        ranges maps time fields to (lower, upper) datetimes, lower inclusive
+        and upper exclusive, either of which may be None. after is the
+        (timestamp, id) of the last task on the previous page. The field's
+        ordered index is bisected to the range, so only tasks inside it are
+        visited.
+        """
+        user_tasks = self._users.get(user_id)
+        if user_tasks is None:
+            return []
+        ids = self._time_ids(user_tasks, field, descending, ranges, status, priority, after)
+        tasks = self._tasks
+        return [tasks[task_id] for task_id in islice(ids, limit)]
+
+    def count_by_time(self, user_id, ranges, status=None, priority=None):
+        """Count a user's tasks within the time ranges and filters"""
+        user_tasks = self._users.get(user_id)
+        if user_tasks is None:
+            return 0
+        field = next(iter(ranges), "created_at")
+        return sum(1 for _ in self._time_ids(user_tasks, field, False, ranges, status, priority, None))
+
+    def _time_ids(self, user_tasks, field, descending, ranges, status, priority, after):
+        bounds = {
+            name: tuple(None if moment is None else to_micros(moment) for moment in bound)
+            for name, bound in (ranges or {}).items()
+        }
+        lower, upper = bounds.pop(field, (None, None))
+        if after is not None:
+            after = (to_micros(after[0]), after[1])
+        ids = user_tasks.by_time[field].between(lower, upper, descending, after)
+
+        for name, (low, high) in bounds.items():
+            ids = _within(ids, user_tasks.by_time[name], low, high)
+        if status:
+            ids = (task_id for task_id in ids if task_id in user_tasks.by_status.get(status, ()))
+        if priority:
+            ids = (task_id for task_id in ids if task_id in user_tasks.by_priority.get(priority, ()))
+        return ids
+
+    def search(self, user_id, query, status=None, priority=None):
+        """List a user's tasks matching every word of query, most relevant first.
+
+        Each word matches title and description terms equal to it or starting
+        with it. Only the user's own index is consulted.
+        """
+        user_tasks = self._users.get(user_id)
+        if user_tasks is None:
+            return []
+
+        scores = user_tasks.text.search(query, len(user_tasks.all))
+        ids = scores.keys()
+        if status:
+            ids = [task_id for task_id in ids if task_id in user_tasks.by_status.get(status, ())]
+        if priority:
+            ids = [task_id for task_id in ids if task_id in user_tasks.by_priority.get(priority, ())]
+
+        tasks = self._tasks
+        return [tasks[task_id] for task_id in sorted(ids, key=lambda task_id: (-scores[task_id], task_id))]
+
+    def count(self, user_id, status=None, priority=None):
+        """Count a user's tasks matching the filters without listing them"""
+        user_tasks = self._users.get(user_id)
+        if user_tasks is None:
+            return 0
+        if status and priority:
+            by_status = user_tasks.by_status.get(status, ())
+            by_priority = user_tasks.by_priority.get(priority, ())
+            smaller, other = sorted((by_status, by_priority), key=len)
+            return sum(1 for task_id in smaller if task_id in other)
+        if status:
+            return len(user_tasks.by_status.get(status, ()))
+        if priority:
+            return len(user_tasks.by_priority.get(priority, ()))
+        return len(user_tasks.all)
+
+    def stats(self, user_id):
+        """Count a user's tasks in total, by status and by priority"""
+        user_tasks = self._users.get(user_id)
+        if user_tasks is None:
+            return {"total": 0, "status": {}, "priority": {}}
+        return user_tasks.stats()
+
+    def check_consistency(self):
+        """Rebuild every user's indexes and counts from the primary index.
+
+        Also checks that each task's latest change is logged. Returns a list
+        of discrepancies, empty when the incrementally maintained indexes,
+        counters and change logs agree with the stored tasks.
+        """
+        expected = {}
+        for task in self._tasks.values():
+            rebuilt = expected.get(task["user_id"])
+            if rebuilt is None:
+                rebuilt = expected[task["user_id"]] = _UserTasks()
+            created, updated = (to_micros(datetime.fromisoformat(task[field])) for field in TIME_FIELDS)
+            rebuilt.add(task, created, updated)
+
+        problems = []
+        for user_id in expected.keys() | self._users.keys():
+            actual = _snapshot(self._users.get(user_id))
+            wanted = _snapshot(expected.get(user_id))
+            if actual != wanted:
+                problems.append(f"user {user_id}: indexed {actual}, stored {wanted}")
+
+        # Each user's change log must hold exactly their stored tasks, besides tombstones
+        stored = {(task["user_id"], task["id"]) for task in self._tasks.values()}
+        logged = {
+            (user_id, task_id)
+            for user_id, log in self._changes.items()
+            for task_id in log.entries()
+            if task_id in self._tasks
+        }
+        if logged != stored:
+            problems.append(f"change log: {len(stored - logged)} tasks missing, {len(logged - stored)} misplaced")
+        return problems
+
+
+def _within(ids, index, lower, upper):
+    """Filter ids to those whose timestamp in index lies in [lower, upper)"""
+    for task_id in ids:
+        key = index.key(task_id)
+        if (lower is None or key >= lower) and (upper is None or key < upper):
+            yield task_id
+
+
+def _snapshot(user_tasks):
+    """Materialise a user's indexes and counts for comparison"""
+    if user_tasks is None:
+        return None
+    return {
+        "ids": list(user_tasks.all),
+        "status": {key: list(bucket) for key, bucket in user_tasks.by_status.items()},
+        "priority": {key: list(bucket) for key, bucket in user_tasks.by_priority.items()},
+        "terms": user_tasks.text.postings,
+        "vocabulary": user_tasks.text.terms,
+        "time": {
+            field: [(index.key(task_id), task_id) for task_id in index.between()]
+            for field, index in user_tasks.by_time.items()
+        },
+        "counts": user_tasks.stats(),
+    }
+
+
+class UserStore:
+    """User storage indexed by id, username and email.
+
+    Uniqueness checks and login lookups go through the username and email
+    indexes instead of scanning every user.
+    """
+
+    def __init__(self):
+        self._users = {}
+        self._by_username = {}
+        self._by_email = {}
+        self._role_counts = {}
+        self._ids = count(1)
+
+    def __len__(self):
+        return len(self._users)
+
+    def __contains__(self, user_id):
+        return user_id in self._users
+
+    def __getitem__(self, user_id):
+        return self._users[user_id]
+
+    def get(self, user_id):
+        """Get a user by id, or None"""
+        return self._users.get(user_id)
+
+    def values(self):
+        """All users in creation order"""
+        return self._users.values()
+
+    def clear(self):
+        """Remove all users"""
+        self._users.clear()
+        self._by_username.clear()
+        self._by_email.clear()
+        self._role_counts.clear()
+        self._ids = count(1)
+
+    def add(self, user):
+        """Assign an id to a new user and store it.
+
+        Returns the stored user, or None if the username or email is taken.
+        """
+        if user["username"] in self._by_username or user["email"] in self._by_email:
+            return None
+
+        user["id"] = next(self._ids)
+        self._users[user["id"]] = user
+        self._by_username[user["username"]] = user
+        self._by_email[user["email"]] = user
+        role = user.get("role")
+        self._role_counts[role] = self._role_counts.get(role, 0) + 1
+        return user
+
+    def pop(self, user_id):
+        """Remove a user by id and return it"""
+        user = self._users.pop(user_id)
+        del self._by_username[user["username"]]
+        del self._by_email[user["email"]]
+        self._role_counts[user.get("role")] -= 1
+        return user
+
+    def get_by_username(self, username):
+        """Get a user by username, or None"""
+        return self._by_username.get(username)
+
+    def email_taken(self, email):
+        """Whether a user with this email exists"""
+        return email in self._by_email
+
+    def count_role(self, role):
+        """Number of users with the given role"""
+        return self._role_counts.get(role, 0)
+
+
+def create_task_store():
+    """Create the task store for the configured backend"""
+    if STORAGE_BACKEND == "sqlite":
+        from src.sqlite_store import SQLiteTaskStore
+
+        return SQLiteTaskStore(DATABASE_PATH)
+    if STORAGE_BACKEND == "memory":
+        return TaskStore()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
+
+def create_user_store():
+    """Create the user store for the configured backend"""
+    if STORAGE_BACKEND == "sqlite":
+        from src.sqlite_store import SQLiteUserStore
+
+        return SQLiteUserStore(DATABASE_PATH)
+    if STORAGE_BACKEND == "memory":
+        return UserStore()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
@@ -5,5 +5,8 @@ Pytest configuration and fixtures
 import os
 import sys
 
+# Use the cheapest bcrypt cost factor to keep the suite fast
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 # Add the src directory to the path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
@@ -6,6 +6,7 @@ import json
 
 import pytest
 
+from src import events
 from src.app import app
 
 
@@ -13,11 +14,12 @@ from src.app import app
 def client():
     """Create test client"""
     app.config["TESTING"] = True
-    # Clear users dict and reset counter before each test
+    # Clear users and tasks before each test; clearing also restarts id allocation
     from src import auth
+    from src.app import tasks
 
+    tasks.clear()
     auth.users.clear()
-    auth.user_id_counter = 1  # Reset counter
     auth.initialize_admin()  # Re-initialize admin user with ID 1
     with app.test_client() as client:
         yield client
@@ -152,3 +154,410 @@ def test_get_stats(client, auth_headers):
     assert "in_progress" in data
     assert "completed" in data
     assert "by_priority" in data
+
+
+def test_delete_task_keeps_order(client, auth_headers):
+    """Test deleting a task leaves the remaining tasks in creation order"""
+    ids = []
+    for title in ("Order A", "Order B", "Order C"):
+        response = client.post("/api/v1/tasks", data=json.dumps({"title": title}), headers=auth_headers)
+        ids.append(response.get_json()["id"])
+
+    client.delete(f"/api/v1/tasks/{ids[1]}", headers=auth_headers)
+
+    titles = [t["title"] for t in client.get("/api/v1/tasks", headers=auth_headers).get_json()["tasks"]]
+    assert titles == ["Order A", "Order C"]
+
+
+def test_admin_delete_user_removes_tasks(client, auth_headers):
+    """Test deleting a user as admin removes the user's tasks"""
+    from src.app import tasks
+
+    client.post("/api/v1/tasks", data=json.dumps({"title": "Doomed"}), headers=auth_headers)
+    user_id = client.get("/api/v1/auth/me", headers=auth_headers).get_json()["id"]
+
+    login = client.post(
+        "/api/v1/auth/login",
+        data=json.dumps({"username": "admin", "password": "admin@123"}),
+        content_type="application/json",
+    )
+    admin_headers = {"Authorization": f"Bearer {login.get_json()['token']}"}
+
+    response = client.delete(f"/api/v1/admin/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert tasks.list(user_id) == []
+
+
+def test_get_stats_counts(client, auth_headers):
+    """Test statistics reflect created and updated tasks"""
+    client.post("/api/v1/tasks", data=json.dumps({"title": "A", "priority": "high"}), headers=auth_headers)
+    created = client.post("/api/v1/tasks", data=json.dumps({"title": "B"}), headers=auth_headers)
+    task_id = created.get_json()["id"]
+    client.put(f"/api/v1/tasks/{task_id}", data=json.dumps({"status": "completed"}), headers=auth_headers)
+
+    data = client.get("/api/v1/tasks/stats", headers=auth_headers).get_json()
+    assert data["total"] == 2
+    assert data["pending"] == 1
+    assert data["completed"] == 1
+    assert data["in_progress"] == 0
+    assert data["by_priority"] == {"high": 1, "medium": 1, "low": 0}
+
+
+def test_register_duplicate_username_and_email(client):
+    """Test registration rejects taken usernames and emails"""
+    payload = {"username": "dupe", "email": "dupe@test.com", "password": "secret123"}
+    assert client.post("/api/v1/auth/register", json=payload).status_code == 201
+
+    response = client.post("/api/v1/auth/register", json={**payload, "email": "other@test.com"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Username already exists"
+
+    response = client.post("/api/v1/auth/register", json={**payload, "username": "other"})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Email already exists"
+
+
+def test_login_sheds_load_when_hashing_pool_is_full(client, monkeypatch):
+    """Test login and register return 503 with Retry-After when bcrypt is saturated"""
+    import threading
+
+    from src import auth
+
+    monkeypatch.setattr(auth, "_hash_slots", threading.Semaphore(0))
+
+    response = client.post("/api/v1/auth/login", json={"username": "admin", "password": "admin@123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(auth.HASH_RETRY_AFTER_SECONDS)
+
+    response = client.post(
+        "/api/v1/auth/register", json={"username": "busy", "email": "busy@test.com", "password": "secret123"}
+    )
+    assert response.status_code == 503
+    assert auth.users.get_by_username("busy") is None
+
+
+def test_get_tasks_pagination(client, auth_headers):
+    """Test paging through tasks with limit and cursor"""
+    for i in range(5):
+        client.post("/api/v1/tasks", data=json.dumps({"title": f"Page {i}"}), headers=auth_headers)
+
+    titles = []
+    cursor = None
+    while True:
+        url = "/api/v1/tasks?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        data = client.get(url, headers=auth_headers).get_json()
+        assert data["total"] == 5
+        titles.extend(t["title"] for t in data["tasks"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == [f"Page {i}" for i in range(5)]
+
+
+def test_get_tasks_field_projection(client, auth_headers):
+    """Test fields= returns only the requested fields"""
+    client.post("/api/v1/tasks", data=json.dumps({"title": "Slim", "description": "long"}), headers=auth_headers)
+
+    data = client.get("/api/v1/tasks?fields=id,title", headers=auth_headers).get_json()
+    assert data["tasks"] == [{"id": data["tasks"][0]["id"], "title": "Slim"}]
+
+    response = client.get("/api/v1/tasks?fields=id,secret", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_get_tasks_search(client, auth_headers):
+    """Test q= searches titles and descriptions and pages through ranked results"""
+    for title, description in [("Fix login bug", ""), ("Write docs", "explain login flow"), ("Lunch", "")]:
+        client.post("/api/v1/tasks", json={"title": title, "description": description}, headers=auth_headers)
+    client.put("/api/v1/tasks/3", json={"title": "Logistics"}, headers=auth_headers)
+
+    data = client.get("/api/v1/tasks?q=log", headers=auth_headers).get_json()
+    assert sorted(t["title"] for t in data["tasks"]) == ["Fix login bug", "Logistics", "Write docs"]
+    assert data["total"] == 3
+
+    first = client.get("/api/v1/tasks?q=login&limit=1", headers=auth_headers).get_json()
+    assert [t["title"] for t in first["tasks"]] == ["Fix login bug"]
+    assert first["next_cursor"] == 1
+    second = client.get("/api/v1/tasks?q=login&limit=1&cursor=1", headers=auth_headers).get_json()
+    assert [t["title"] for t in second["tasks"]] == ["Write docs"]
+    assert second["next_cursor"] is None
+
+    client.delete("/api/v1/tasks/1", headers=auth_headers)
+    data = client.get("/api/v1/tasks?q=bug", headers=auth_headers).get_json()
+    assert data == {"tasks": [], "total": 0, "next_cursor": None}
+
+
+def test_get_tasks_sorted_by_time(client, auth_headers):
+    """Test sort= and time filters, paging with the (time, id) cursor"""
+    for i in range(5):
+        client.post("/api/v1/tasks", json={"title": f"Task {i}"}, headers=auth_headers)
+    updated = client.put("/api/v1/tasks/2", json={"status": "completed"}, headers=auth_headers).get_json()
+
+    titles = []
+    cursor = None
+    while True:
+        url = "/api/v1/tasks?sort=-created_at&limit=2" + (f"&cursor={cursor}" if cursor else "")
+        data = client.get(url, headers=auth_headers).get_json()
+        assert data["total"] == 5
+        titles.extend(t["title"] for t in data["tasks"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert titles == [f"Task {i}" for i in reversed(range(5))]
+
+    data = client.get("/api/v1/tasks?sort=-updated_at&limit=1", headers=auth_headers).get_json()
+    assert data["tasks"][0]["id"] == 2
+
+    since = updated["updated_at"]
+    data = client.get(f"/api/v1/tasks?updated_since={since}", headers=auth_headers).get_json()
+    assert [t["id"] for t in data["tasks"]] == [2]
+    data = client.get(f"/api/v1/tasks?created_after={since}", headers=auth_headers).get_json()
+    assert data["tasks"] == []
+
+
+def test_get_tasks_invalid_time_params(client, auth_headers):
+    """Test malformed sort, time filter and cursor values are rejected"""
+    for query in ("sort=title", "created_after=yesterday", "sort=created_at&cursor=12", "q=x&sort=updated_at"):
+        assert client.get(f"/api/v1/tasks?{query}", headers=auth_headers).status_code == 400
+
+
+def test_get_tasks_invalid_limit(client, auth_headers):
+    """Test invalid pagination parameters are rejected"""
+    assert client.get("/api/v1/tasks?limit=0", headers=auth_headers).status_code == 400
+    assert client.get("/api/v1/tasks?limit=abc", headers=auth_headers).status_code == 400
+    assert client.get("/api/v1/tasks?cursor=-1", headers=auth_headers).status_code == 400
+
+
+def test_task_changes_delta_sync(client, auth_headers):
+    """Test syncing from a watermark returns only changed tasks and tombstones"""
+    for i in range(3):
+        client.post("/api/v1/tasks", json={"title": f"Task {i}"}, headers=auth_headers)
+
+    full = client.get("/api/v1/tasks/changes", headers=auth_headers).get_json()
+    assert [c["task"]["title"] for c in full["changes"]] == ["Task 0", "Task 1", "Task 2"]
+    assert full["has_more"] is False
+
+    client.put("/api/v1/tasks/1", json={"status": "completed"}, headers=auth_headers)
+    client.delete("/api/v1/tasks/2", headers=auth_headers)
+    delta = client.get(f"/api/v1/tasks/changes?since={full['watermark']}", headers=auth_headers).get_json()
+    assert delta["changes"] == [
+        {"id": 1, "deleted": False, "task": client.get("/api/v1/tasks/1", headers=auth_headers).get_json()},
+        {"id": 2, "deleted": True},
+    ]
+
+    page = client.get(f"/api/v1/tasks/changes?since={full['watermark']}&limit=1", headers=auth_headers)
+    page = page.get_json()
+    assert page["has_more"] is True and len(page["changes"]) == 1
+    rest = client.get(f"/api/v1/tasks/changes?since={page['watermark']}", headers=auth_headers).get_json()
+    assert [c["id"] for c in rest["changes"]] == [2]
+
+    caught_up = client.get(f"/api/v1/tasks/changes?since={delta['watermark']}", headers=auth_headers)
+    assert caught_up.get_json()["changes"] == []
+
+
+def test_task_changes_resync_required(client, auth_headers):
+    """Test watermarks from another store epoch are refused with 410, malformed ones with 400"""
+    client.post("/api/v1/tasks", json={"title": "Task"}, headers=auth_headers)
+
+    response = client.get("/api/v1/tasks/changes?since=deadbeef-0", headers=auth_headers)
+    assert response.status_code == 410
+    assert client.get("/api/v1/tasks/changes?since=banana", headers=auth_headers).status_code == 400
+
+
+def read_events(stream, count):
+    """Parse the next count SSE messages (comments included) from a streamed response"""
+    messages = []
+    for chunk in stream:
+        for block in chunk.decode("utf-8").split("\n\n"):
+            if block:
+                fields = dict(line.split(": ", 1) if ": " in line else (line, "") for line in block.split("\n"))
+                messages.append(fields)
+        if len(messages) >= count:
+            return messages
+    return messages
+
+
+@pytest.fixture
+def stream_client(client, monkeypatch):
+    """Test client with event stream heartbeats every 10 ms"""
+    monkeypatch.setattr(events, "EVENT_HEARTBEAT_SECONDS", 0.01)
+    return client
+
+
+def test_event_stream_pushes_task_changes(stream_client, auth_headers):
+    """Test creates, updates and deletes arrive as events with resumable ids"""
+    client = stream_client
+    response = client.get("/api/v1/tasks/events", headers=auth_headers, buffered=False)
+    assert response.mimetype == "text/event-stream"
+    stream = iter(response.response)
+    assert read_events(stream, 1) == [{"retry": "3000"}]
+
+    client.post("/api/v1/tasks", json={"title": "Live"}, headers=auth_headers)
+    client.put("/api/v1/tasks/1", json={"status": "completed"}, headers=auth_headers)
+    client.post("/api/v1/tasks", json={"title": "Short-lived"}, headers=auth_headers)
+    client.delete("/api/v1/tasks/2", headers=auth_headers)
+
+    messages = read_events(stream, 2)
+    assert [m["event"] for m in messages] == ["updated", "deleted"]
+    assert json.loads(messages[0]["data"])["task"]["status"] == "completed"
+    assert json.loads(messages[1]["data"]) == {"id": 2}
+    assert read_events(stream, 1) == [{"": "heartbeat"}]
+    response.close()
+
+    headers = {**auth_headers, "Last-Event-ID": messages[0]["id"]}
+    resumed = client.get("/api/v1/tasks/events", headers=headers, buffered=False)
+    assert [m.get("event") for m in read_events(iter(resumed.response), 2)] == [None, "deleted"]
+    resumed.close()
+
+
+def test_event_stream_drops_slow_consumers(stream_client, auth_headers, monkeypatch):
+    """Test a stream too far behind the change log is told to resync and ends"""
+    monkeypatch.setattr(events, "EVENT_MAX_LAG", 2)
+    client = stream_client
+    response = client.get("/api/v1/tasks/events", headers=auth_headers, buffered=False)
+    stream = iter(response.response)
+    read_events(stream, 1)
+
+    for i in range(3):
+        client.post("/api/v1/tasks", json={"title": f"Task {i}"}, headers=auth_headers)
+
+    assert [m["event"] for m in read_events(stream, 1)] == ["resync"]
+    assert list(stream) == []
+    response.close()
+
+    response = client.get("/api/v1/tasks/events", headers={**auth_headers, "Last-Event-ID": "deadbeef-1"})
+    assert b"event: resync" in response.data
+
+
+def admin_headers(client):
+    """Log in as the default admin"""
+    login = client.post("/api/v1/auth/login", json={"username": "admin", "password": "admin@123"})
+    return {"Authorization": f"Bearer {login.get_json()['token']}"}
+
+
+def test_export_tasks_ndjson(client, auth_headers):
+    """Test exporting tasks as newline-delimited JSON with filters"""
+    for i in range(3):
+        client.post(
+            "/api/v1/tasks", data=json.dumps({"title": f"Export {i}", "priority": "high"}), headers=auth_headers
+        )
+    client.post("/api/v1/tasks", data=json.dumps({"title": "Low", "priority": "low"}), headers=auth_headers)
+
+    response = client.get("/api/v1/tasks/export?priority=high", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [task["title"] for task in lines] == ["Export 0", "Export 1", "Export 2"]
+
+
+def test_admin_export_all_tasks(client, auth_headers):
+    """Test the admin export includes every user's tasks"""
+    client.post("/api/v1/tasks", data=json.dumps({"title": "Mine"}), headers=auth_headers)
+    headers = admin_headers(client)
+    client.post("/api/v1/tasks", json={"title": "Admin's"}, headers=headers)
+
+    response = client.get("/api/v1/admin/tasks/export", headers=headers)
+    titles = {json.loads(line)["title"] for line in response.get_data(as_text=True).splitlines()}
+    assert titles == {"Mine", "Admin's"}
+
+    assert client.get("/api/v1/admin/tasks/export", headers=auth_headers).status_code == 403
+
+
+def test_export_streams_in_constant_memory(client, auth_headers, monkeypatch):
+    """Test peak memory while exporting does not grow with the number of tasks"""
+    import tracemalloc
+
+    from src import app as app_module
+
+    monkeypatch.setattr(app_module, "EXPORT_BATCH_SIZE", 100)
+    user_id = client.get("/api/v1/auth/me", headers=auth_headers).get_json()["id"]
+    for i in range(20000):
+        app_module.tasks.create(user_id, f"Bulk task {i}", description="x" * 100)
+
+    response = client.get("/api/v1/tasks/export", headers=auth_headers, buffered=False)
+    tracemalloc.start()
+    exported = 0
+    for chunk in response.response:
+        exported += len(chunk)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    response.close()
+
+    assert exported > 4_000_000
+    assert peak < exported / 10
+
+
+def test_batch_operations(client, auth_headers):
+    """Test a batch applies creates, updates and deletes with per-item results"""
+    first = client.post("/api/v1/tasks", data=json.dumps({"title": "Keep"}), headers=auth_headers).get_json()
+    second = client.post("/api/v1/tasks", data=json.dumps({"title": "Drop"}), headers=auth_headers).get_json()
+
+    operations = [
+        {"op": "create", "data": {"title": "New", "priority": "high"}},
+        {"op": "update", "id": first["id"], "data": {"status": "completed"}},
+        {"op": "delete", "id": second["id"]},
+        {"op": "delete", "id": 99999},
+        {"op": "create", "data": {}},
+    ]
+    response = client.post("/api/v1/tasks/batch", data=json.dumps({"operations": operations}), headers=auth_headers)
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [201, 200, 200, 404, 400]
+    assert results[0]["task"]["title"] == "New"
+    assert results[1]["task"]["status"] == "completed"
+
+    titles = [t["title"] for t in client.get("/api/v1/tasks", headers=auth_headers).get_json()["tasks"]]
+    assert titles == ["Keep", "New"]
+
+
+def test_batch_atomic_rejects_everything(client, auth_headers):
+    """Test an atomic batch with one invalid operation applies nothing"""
+    task = client.post("/api/v1/tasks", data=json.dumps({"title": "Stay"}), headers=auth_headers).get_json()
+
+    operations = [
+        {"op": "delete", "id": task["id"]},
+        {"op": "update", "id": task["id"], "data": {"title": "Gone already"}},
+    ]
+    response = client.post(
+        "/api/v1/tasks/batch", data=json.dumps({"operations": operations, "atomic": True}), headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert [r["status"] for r in response.get_json()["results"]] == [424, 404]
+    assert client.get(f"/api/v1/tasks/{task['id']}", headers=auth_headers).status_code == 200
+
+
+def test_batch_requires_operations(client, auth_headers):
+    """Test a batch without operations is rejected"""
+    response = client.post("/api/v1/tasks/batch", data=json.dumps({"operations": []}), headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_conditional_get_returns_304_until_tasks_change(client, auth_headers):
+    """Test ETag / If-None-Match on the task list, a single task and stats"""
+    task = client.post("/api/v1/tasks", data=json.dumps({"title": "Cached"}), headers=auth_headers).get_json()
+
+    for url in ("/api/v1/tasks", f"/api/v1/tasks/{task['id']}", "/api/v1/tasks/stats"):
+        first = client.get(url, headers=auth_headers)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        repeat = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert repeat.status_code == 304
+        assert repeat.data == b""
+        assert repeat.headers["ETag"] == etag
+
+    etag = client.get("/api/v1/tasks", headers=auth_headers).headers["ETag"]
+    assert client.get("/api/v1/tasks?status=pending", headers=auth_headers).headers["ETag"] != etag
+
+    client.put(f"/api/v1/tasks/{task['id']}", data=json.dumps({"status": "completed"}), headers=auth_headers)
+    changed = client.get("/api/v1/tasks", headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_conditional_get_skips_missing_task(client, auth_headers):
+    """Test 404 responses carry no ETag"""
+    response = client.get("/api/v1/tasks/99999", headers=auth_headers)
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
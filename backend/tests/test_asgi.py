@@ -0,0 +1,127 @@
+"""
+Tests for the ASGI entry point
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src import events
+from src.app import event_hub
+from src.asgi import ASGIAdapter, app, wsgi_environ
+
+
+def http_scope(method, path, headers=(), query_string=b""):
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "query_string": query_string,
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+
+async def call(adapter, method, path, body=None, headers=()):
+    """Send one request through the adapter; returns status, headers and body"""
+    data = json.dumps(body).encode() if body is not None else b""
+    headers = [*headers, ("content-type", "application/json"), ("content-length", str(len(data)))]
+    messages, sent = [{"type": "http.request", "body": data, "more_body": False}], []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await adapter(http_scope(method, path, headers), receive, send)
+    start = sent[0]
+    assert sent[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+
+
+async def register(adapter, name):
+    credentials = {"username": name, "email": f"{name}@example.com", "password": "asgi-password"}
+    status, _, body = await call(adapter, "POST", "/api/v1/auth/register", credentials)
+    assert status == 201
+    return [("authorization", f"Bearer {json.loads(body)['token']}")]
+
+
+def test_wsgi_environ():
+    """Test ASGI scopes translate to WSGI environs"""
+    scope = http_scope("GET", "/api/v1/tasks", [("x-trace", "a"), ("x-trace", "b"), ("content-type", "text/plain")])
+    scope["query_string"] = b"limit=5"
+    environ = wsgi_environ(scope, b"body")
+
+    assert environ["REQUEST_METHOD"] == "GET"
+    assert environ["PATH_INFO"] == "/api/v1/tasks"
+    assert environ["QUERY_STRING"] == "limit=5"
+    assert environ["HTTP_X_TRACE"] == "a,b"
+    assert environ["CONTENT_TYPE"] == "text/plain"
+    assert environ["REMOTE_ADDR"] == "127.0.0.1"
+    assert environ["wsgi.input"].read() == b"body"
+
+
+def test_blocking_routes_leave_the_loop():
+    """Test hashing and export routes run in the thread pool, task routes inline"""
+    assert app.blocks("/api/v1/auth/login")
+    assert app.blocks("/api/v1/tasks/export")
+    assert not app.blocks("/api/v1/tasks")
+    assert ASGIAdapter(app.wsgi_app, threads=1, inline=False).blocks("/api/v1/tasks")
+
+
+@pytest.mark.parametrize("inline", [True, False])
+def test_task_round_trip(inline):
+    """Test requests behave the same on the loop and in the thread pool"""
+    adapter = ASGIAdapter(app.wsgi_app, threads=2, inline=inline)
+
+    async def scenario():
+        headers = await register(adapter, f"asgi{inline}")
+        status, _, body = await call(adapter, "POST", "/api/v1/tasks", {"title": "Over ASGI"}, headers)
+        assert status == 201
+        task_id = json.loads(body)["id"]
+
+        status, response_headers, body = await call(adapter, "GET", f"/api/v1/tasks/{task_id}", headers=headers)
+        assert status == 200
+        assert response_headers[b"content-type"] == b"application/json"
+        assert json.loads(body)["title"] == "Over ASGI"
+
+        status, _, body = await call(adapter, "GET", "/api/v1/tasks/export", headers=headers)
+        assert [json.loads(line)["id"] for line in body.splitlines()] == [task_id]
+
+    asyncio.run(scenario())
+
+
+def test_event_stream_is_served_asynchronously(monkeypatch):
+    """Test event streams run on the loop and unsubscribe when the client leaves"""
+    monkeypatch.setattr(events, "EVENT_HEARTBEAT_SECONDS", 0.01)
+
+    async def scenario():
+        headers = await register(app, "asgistream")
+        received, disconnect = asyncio.Queue(), asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            await received.put(message)
+
+        stream = asyncio.ensure_future(app(http_scope("GET", "/api/v1/tasks/events", headers), receive, send))
+        assert (await received.get())["status"] == 200
+        assert (await received.get())["body"] == b"retry: 3000\n\n"
+        subscribers = len(event_hub)
+
+        await call(app, "POST", "/api/v1/tasks", {"title": "Pushed"}, headers)
+        while b"event: created" not in (message := await received.get())["body"]:
+            assert message["body"] == b": heartbeat\n\n"
+        assert b'"title":"Pushed"' in message["body"]
+
+        disconnect.set()
+        await asyncio.wait_for(stream, 1)
+        assert len(event_hub) == subscribers - 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+"""
+Tests for authentication helpers
+"""
+
+import time
+
+from src.auth import TokenCache, decode_token, generate_token, token_cache
+
+
+def test_decode_token_uses_cache():
+    """Test repeated decodes of one token hit the cache"""
+    token_cache.clear()
+    token = generate_token(42, "cached", "user")
+
+    first = decode_token(token)
+    second = decode_token(token)
+
+    assert first["user_id"] == 42
+    assert second is first
+    assert token_cache.stats()["hits"] == 1
+    assert token_cache.stats()["misses"] == 1
+
+
+def test_invalid_token_is_not_cached():
+    """Test tokens failing verification are never cached"""
+    token_cache.clear()
+
+    assert decode_token("not-a-token") is None
+    assert token_cache.stats()["size"] == 0
+
+
+def test_token_cache_honours_exp():
+    """Test expired entries are dropped on lookup"""
+    cache = TokenCache(10)
+    cache.put("expired", {"user_id": 1, "exp": time.time() - 1})
+    cache.put("valid", {"user_id": 2, "exp": time.time() + 60})
+
+    assert cache.get("expired") is None
+    assert cache.get("valid")["user_id"] == 2
+    assert cache.stats()["size"] == 1
+
+
+def test_token_cache_evicts_least_recently_used():
+    """Test the cache stays within maxsize"""
+    cache = TokenCache(2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    cache.get("a")
+    cache.put("c", {"exp": exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_token_cache_disabled_with_zero_size():
+    """Test maxsize 0 turns caching off"""
+    cache = TokenCache(0)
+    cache.put("a", {"exp": time.time() + 60})
+
+    assert cache.get("a") is None
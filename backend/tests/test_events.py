@@ -0,0 +1,42 @@
+"""
+Tests for the task change event hub
+"""
+
+import threading
+
+import pytest
+
+from src.events import EventHub, HubFullError
+
+
+def test_publish_wakes_only_the_users_subscriptions():
+    """Test a change wakes the user's streams and leaves others waiting"""
+    hub = EventHub()
+    first, second, other = hub.subscribe(1), hub.subscribe(1), hub.subscribe(2)
+
+    hub.publish(1)
+    assert first.wait(0) and second.wait(0)
+    assert not other.wait(0)
+    assert not first.wait(0)
+
+
+def test_wait_returns_when_notified_from_another_thread():
+    """Test a waiting subscription wakes up as soon as it is notified"""
+    hub = EventHub()
+    subscription = hub.subscribe(1)
+    threading.Timer(0.01, hub.publish, (1,)).start()
+    assert subscription.wait(5)
+
+
+def test_subscriber_limit_and_unsubscribe():
+    """Test the hub refuses subscribers at capacity and frees slots on unsubscribe"""
+    hub = EventHub(max_subscribers=2)
+    first = hub.subscribe(1)
+    hub.subscribe(2)
+    with pytest.raises(HubFullError):
+        hub.subscribe(3)
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(first)
+    assert hub.stats() == {"subscribers": 1, "users": 1}
+    hub.subscribe(3)
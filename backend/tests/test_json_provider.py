@@ -0,0 +1,64 @@
+"""
+Tests for the JSON provider and encoded task cache
+"""
+
+import json
+
+import pytest
+from flask import Flask
+
+from src.json_provider import FastJSONProvider, TaskJSONCache
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def provider(request, monkeypatch):
+    """Provider with and without orjson"""
+    monkeypatch.setattr(FastJSONProvider, "use_orjson", request.param and FastJSONProvider.use_orjson)
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    yield app.json
+
+
+def test_dumps_bytes_is_compact_and_sorted(provider):
+    """Test compact, key-sorted output"""
+    assert provider.dumps_bytes({"b": 1, "a": [1, 2]}) == b'{"a":[1,2],"b":1}'
+
+
+def test_dumps_bytes_falls_back_for_big_integers(provider):
+    """Test values orjson rejects still encode"""
+    assert json.loads(provider.dumps_bytes({"n": 2**70})) == {"n": 2**70}
+
+
+def test_loads_accepts_what_stdlib_accepts(provider):
+    """Test decoding falls back to the stdlib for non-standard input"""
+    assert provider.loads(b'{"a": 1}') == {"a": 1}
+    assert provider.loads("[NaN]")[0] != provider.loads("[NaN]")[0]
+
+
+def test_response_appends_newline(provider):
+    """Test responses match the default provider's framing"""
+    response = provider.response({"ok": True})
+    assert response.get_data() == b'{"ok":true}\n'
+    assert response.mimetype == "application/json"
+
+
+def test_task_cache_reuses_until_task_changes(provider):
+    """Test cached encodings are reused and refreshed on update"""
+    cache = TaskJSONCache(provider, maxsize=10)
+    task = {"id": 1, "title": "a", "updated_at": "t1"}
+
+    first = cache.encode(task)
+    assert cache.encode(task) is first
+
+    task.update(title="b", updated_at="t2")
+    assert json.loads(cache.encode(task))["title"] == "b"
+    assert json.loads(cache.encode_many([task, {**task, "id": 2}])) == [task, {**task, "id": 2}]
+
+
+def test_task_cache_is_bounded(provider):
+    """Test the cache drops the oldest entries beyond maxsize"""
+    cache = TaskJSONCache(provider, maxsize=2)
+    for task_id in range(5):
+        cache.encode({"id": task_id, "updated_at": "t"})
+
+    assert sorted(cache._entries) == [3, 4]
@@ -0,0 +1,414 @@
+"""
+Tests for the indexed task store
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import sqlite_store
+from src import store as memory_store
+from src.sqlite_store import SQLiteTaskStore, SQLiteUserStore
+from src.store import ChangeLog, IdIndex, TaskStore, TimeIndex, UserStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def task_store(request, tmp_path):
+    """Task store for each storage backend"""
+    if request.param == "sqlite":
+        return SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    return TaskStore()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def user_store(request, tmp_path):
+    """User store for each storage backend"""
+    if request.param == "sqlite":
+        return SQLiteUserStore(str(tmp_path / "tasks.db"))
+    return UserStore()
+
+
+def test_id_index_keeps_ascending_order():
+    """Test ids iterate in ascending order regardless of insertion order"""
+    index = IdIndex()
+    for task_id in (5, 1, 9, 3):
+        index.add(task_id)
+
+    assert list(index) == [1, 3, 5, 9]
+    assert len(index) == 4
+
+
+def test_id_index_discard_and_readd():
+    """Test removed ids are skipped and can be re-added without duplicates"""
+    index = IdIndex()
+    for task_id in range(1, 6):
+        index.add(task_id)
+
+    index.discard(3)
+    assert 3 not in index
+    assert list(index) == [1, 2, 4, 5]
+
+    index.add(3)
+    assert list(index) == [1, 2, 3, 4, 5]
+
+
+def test_id_index_compacts_stale_entries():
+    """Test stale entries are purged after many removals"""
+    index = IdIndex()
+    for task_id in range(1000):
+        index.add(task_id)
+    for task_id in range(990):
+        index.discard(task_id)
+
+    assert list(index) == list(range(990, 1000))
+    assert len(index._ids) < 1000
+
+
+def test_time_index_orders_by_key_then_id():
+    """Test ranges and resume positions in both directions, with moved entries"""
+    index = TimeIndex()
+    for task_id, key in [(1, 10), (2, 30), (3, 20), (4, 20), (5, 40)]:
+        index.add(task_id, key)
+    index.add(2, 50)
+    index.discard(5)
+
+    assert list(index.between()) == [1, 3, 4, 2]
+    assert list(index.between(descending=True)) == [2, 4, 3, 1]
+    assert list(index.between(20, 50)) == [3, 4]
+    assert list(index.between(after=(20, 3))) == [4, 2]
+    assert list(index.between(descending=True, after=(20, 4))) == [3, 1]
+    assert index.key(2) == 50 and index.key(5) is None
+
+    index.add(2, 30)
+    assert list(index.between()) == [1, 3, 4, 2]
+    assert len(index) == 4
+
+
+def test_time_index_compacts_stale_entries():
+    """Test entries left behind by moves are purged"""
+    index = TimeIndex()
+    for key in range(1000):
+        index.add(1, key)
+
+    assert list(index.between()) == [1]
+    assert len(index._keys) < 100
+
+
+def test_create_and_get(task_store):
+    """Test a created task can be fetched by its owner only"""
+    store = task_store
+    task = store.create(1, "Write tests", priority="high")
+
+    assert store.get(task["id"], 1) == task
+    assert store.get(task["id"], 2) is None
+    assert task["status"] == "pending"
+    assert task["created_at"] == task["updated_at"]
+
+
+def test_list_filters_use_indexes(task_store):
+    """Test listing by status, priority and both"""
+    store = task_store
+    store.create(1, "a", status="pending", priority="high")
+    store.create(1, "b", status="completed", priority="high")
+    store.create(1, "c", status="pending", priority="low")
+    store.create(2, "d", status="pending", priority="high")
+
+    assert [t["title"] for t in store.list(1)] == ["a", "b", "c"]
+    assert [t["title"] for t in store.list(1, status="pending")] == ["a", "c"]
+    assert [t["title"] for t in store.list(1, priority="high")] == ["a", "b"]
+    assert [t["title"] for t in store.list(1, status="pending", priority="high")] == ["a"]
+    assert store.list(3) == []
+
+
+def test_update_moves_task_between_indexes(task_store):
+    """Test changing status re-indexes the task and keeps creation order"""
+    store = task_store
+    first = store.create(1, "first")
+    second = store.create(1, "second")
+    store.update(second["id"], 1, {"status": "completed"})
+    updated = store.update(first["id"], 1, {"status": "completed", "owner": "ignored"})
+
+    assert store.list(1, status="pending") == []
+    assert [t["title"] for t in store.list(1, status="completed")] == ["first", "second"]
+    assert "owner" not in updated
+    assert updated["title"] == "first"
+    assert store.update(first["id"], 2, {"title": "nope"}) is None
+
+
+def test_delete_and_delete_user_tasks(task_store):
+    """Test deleting a single task and all tasks of a user"""
+    store = task_store
+    task = store.create(1, "a")
+    store.create(1, "b")
+    store.create(2, "c")
+
+    assert store.delete(task["id"], 2) is False
+    assert store.delete(task["id"], 1) is True
+    assert store.get(task["id"], 1) is None
+
+    assert store.delete_user_tasks(1) == 1
+    assert store.list(1) == []
+    assert len(store) == 1
+
+
+def test_stats_counts_by_status_and_priority(task_store):
+    """Test stats follow creates, updates and deletes"""
+    store = task_store
+    a = store.create(1, "a", priority="high")
+    store.create(1, "b", status="completed")
+    store.update(a["id"], 1, {"status": "in-progress", "priority": "low"})
+
+    assert store.stats(1) == {
+        "total": 2,
+        "status": {"in-progress": 1, "completed": 1},
+        "priority": {"low": 1, "medium": 1},
+    }
+
+    store.delete(a["id"], 1)
+    assert store.stats(1) == {"total": 1, "status": {"completed": 1}, "priority": {"medium": 1}}
+    assert store.stats(2) == {"total": 0, "status": {}, "priority": {}}
+
+
+def test_counters_never_drift(task_store):
+    """Test a random mix of operations keeps indexes consistent with the tasks"""
+    rng = random.Random(1234)
+    store = task_store
+    statuses = ("pending", "in-progress", "completed")
+    priorities = ("low", "medium", "high")
+    words = ("alpha", "beta", "gamma", "delta", "alphabet")
+    live = []
+
+    def text():
+        return " ".join(rng.choices(words, k=rng.randint(0, 3)))
+
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.4 or not live:
+            user_id = rng.randint(1, 20)
+            task = store.create(
+                user_id, text(), description=text(), status=rng.choice(statuses), priority=rng.choice(priorities)
+            )
+            live.append((task["id"], user_id))
+        elif op < 0.6:
+            task_id, user_id = rng.choice(live)
+            store.update(task_id, user_id, {"status": rng.choice(statuses), "priority": rng.choice(priorities)})
+        elif op < 0.75:
+            task_id, user_id = rng.choice(live)
+            store.update(task_id, user_id, {"title": text(), "description": text()})
+        elif op < 0.98:
+            task_id, user_id = live.pop(rng.randrange(len(live)))
+            store.delete(task_id, user_id)
+        else:
+            user_id = rng.randint(1, 20)
+            store.delete_user_tasks(user_id)
+            live = [entry for entry in live if entry[1] != user_id]
+
+    assert store.check_consistency() == []
+    assert len(store) == len(live)
+
+
+def test_user_store_indexes(user_store):
+    """Test username and email lookups follow adds and removals"""
+    store = user_store
+    for name, role in (("alice", "admin"), ("bob", "user")):
+        user = {"username": name, "email": f"{name}@example.com", "password": "x", "role": role, "created_at": "now"}
+        assert store.add(user)["id"] == len(store)
+
+    assert store.add({**user, "id": None, "email": "other@example.com"}) is None
+    assert store.get_by_username("bob")["id"] == 2
+    assert store.email_taken("alice@example.com")
+    assert store.count_role("admin") == 1
+
+    store.pop(1)
+    assert store.get_by_username("alice") is None
+    assert not store.email_taken("alice@example.com")
+    assert store.count_role("admin") == 0
+    assert 1 not in store
+    assert [u["id"] for u in store.values()] == [2]
+
+
+def test_list_pages_by_id(task_store):
+    """Test after/limit paging and counts with filters"""
+    for i in range(10):
+        task_store.create(1, f"t{i}", status="done" if i % 2 else "pending")
+
+    assert [t["id"] for t in task_store.list(1, after=3, limit=3)] == [4, 5, 6]
+    assert [t["id"] for t in task_store.list(1, status="done", after=4)] == [6, 8, 10]
+    assert [t["id"] for t in task_store.list(1, status="done", priority="medium", limit=2)] == [2, 4]
+    assert task_store.count(1) == 10
+    assert task_store.count(1, status="done") == 5
+    assert task_store.count(1, status="done", priority="medium") == 5
+    assert task_store.count(1, priority="high") == 0
+
+
+def test_transaction_groups_operations(task_store):
+    """Test operations inside a transaction are applied"""
+    with task_store.transaction():
+        task = task_store.create(1, "a")
+        task_store.update(task["id"], 1, {"status": "completed"})
+
+    assert task_store.get(task["id"], 1)["status"] == "completed"
+
+
+def test_sqlite_transaction_rolls_back_on_error(tmp_path):
+    """Test a failing SQLite transaction leaves no partial writes"""
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.create(1, "a")
+            raise RuntimeError("boom")
+
+    assert len(store) == 0
+    assert store.check_consistency() == []
+
+
+def test_version_bumps_on_every_change(task_store):
+    """Test the per-user version changes with each mutation of that user's tasks"""
+    versions = [task_store.version(1)]
+    task = task_store.create(1, "a")
+    versions.append(task_store.version(1))
+    task_store.update(task["id"], 1, {"title": "b"})
+    versions.append(task_store.version(1))
+    task_store.delete(task["id"], 1)
+    versions.append(task_store.version(1))
+
+    assert versions == sorted(set(versions))
+    assert task_store.version(2) == 0
+
+
+def test_search_matches_words_and_prefixes(task_store):
+    """Test every query word must match a title or description term or its prefix"""
+    store = task_store
+    report = store.create(1, "Write quarterly report", description="Finance numbers for Q3")
+    review = store.create(1, "Review report draft", priority="high")
+    store.create(1, "Buy groceries", description="milk, eggs")
+    store.create(2, "Write report", description="someone else's")
+
+    assert sorted(t["id"] for t in store.search(1, "report")) == [report["id"], review["id"]]
+    assert [t["id"] for t in store.search(1, "REP fin")] == [report["id"]]
+    assert [t["id"] for t in store.search(1, "report", priority="high")] == [review["id"]]
+    assert store.search(1, "report missing") == []
+    assert store.search(1, "!!!") == []
+    assert store.search(3, "report") == []
+
+
+def test_search_ranks_title_matches_first(task_store):
+    """Test title matches outrank description matches"""
+    store = task_store
+    in_description = store.create(1, "Errand", description="fix the fence")
+    in_title = store.create(1, "Fence repair")
+
+    assert [t["id"] for t in store.search(1, "fence")] == [in_title["id"], in_description["id"]]
+
+
+def test_search_follows_updates_and_deletes(task_store):
+    """Test the search index changes with task titles, descriptions and deletions"""
+    store = task_store
+    task = store.create(1, "Plan holiday", description="book flights")
+    other = store.create(1, "Plan budget")
+
+    store.update(task["id"], 1, {"title": "Plan trip", "description": "book hotel"})
+    assert store.search(1, "holiday") == []
+    assert [t["id"] for t in store.search(1, "hotel")] == [task["id"]]
+
+    store.update(task["id"], 1, {"status": "completed"})
+    assert [t["id"] for t in store.search(1, "trip")] == [task["id"]]
+
+    store.delete(other["id"], 1)
+    assert store.search(1, "budget") == []
+    store.delete_user_tasks(1)
+    assert store.search(1, "plan") == []
+    assert store.check_consistency() == []
+
+
+def test_list_by_time_sorts_filters_and_pages(task_store):
+    """Test time-ordered listing with ranges, filters and (time, id) resume positions"""
+    store = task_store
+    created = [store.create(1, f"Task {i}", priority="high" if i % 2 else "low") for i in range(6)]
+    store.create(2, "Other user")
+    touched = store.update(created[1]["id"], 1, {"status": "completed"})
+    ids = [task["id"] for task in created]
+
+    def listed(field, descending=False, **kwargs):
+        return [task["id"] for task in store.list_by_time(1, field, descending, **kwargs)]
+
+    assert listed("created_at") == ids
+    assert listed("created_at", True) == ids[::-1]
+    assert listed("updated_at")[-1] == touched["id"]
+    assert listed("updated_at", True)[0] == touched["id"]
+
+    since = datetime.fromisoformat(touched["updated_at"])
+    assert listed("updated_at", ranges={"updated_at": (since, None)}) == [touched["id"]]
+    assert listed("created_at", priority="high") == ids[1::2]
+
+    third = created[2]
+    after = (datetime.fromisoformat(third["created_at"]), third["id"])
+    assert listed("created_at", after=after, limit=2) == ids[3:5]
+    assert listed("created_at", True, after=after) == ids[1::-1]
+
+    window = {"created_at": (datetime.fromisoformat(third["created_at"]), datetime.max)}
+    assert ids[2] in listed("created_at", ranges=window)
+    assert store.count_by_time(1, window) == len(listed("created_at", ranges=window))
+    assert store.count_by_time(1, {"created_at": (datetime.now() + timedelta(days=1), None)}) == 0
+
+
+def test_change_log_keeps_latest_entry_and_bounded_tombstones():
+    """Test each task is listed once, at its latest change, and old tombstones are pruned"""
+    log = ChangeLog(retention=2)
+    for seq, task_id in enumerate([1, 2, 3, 1], start=1):
+        log.record(task_id, seq)
+    assert list(log.since(0, 4)) == [(2, 2), (3, 3), (4, 1)]
+    assert list(log.since(2, 3)) == [(3, 3)]
+
+    for seq, task_id in enumerate([2, 3, 1], start=5):
+        log.record(task_id, seq, deleted=True)
+    assert log.floor == 5
+    assert list(log.since(0, 7)) == [(6, 3), (7, 1)]
+
+
+def test_changes_since_watermark(task_store):
+    """Test creates, updates and deletes are listed once each after a sequence number"""
+    store = task_store
+    first = store.create(1, "First")
+    second = store.create(1, "Second")
+    store.create(2, "Other user")
+    version, changes = store.changes(1)
+    assert version == 2
+    assert [(seq, task_id) for seq, task_id, _ in changes] == [(1, first["id"]), (2, second["id"])]
+
+    store.update(first["id"], 1, {"title": "First, renamed"})
+    store.delete(second["id"], 1)
+    version, changes = store.changes(1, since=2)
+    assert version == 4
+    assert changes == [(3, first["id"], store.get(first["id"], 1)), (4, second["id"], None)]
+
+    assert store.changes(1, since=4) == (4, [])
+    assert store.changes(1, since=0, limit=1) == (4, [(3, first["id"], store.get(first["id"], 1))])
+    assert store.changes(1, since=5) is None
+    assert store.changes(3) == (0, [])
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_changes_require_resync_past_retention(backend, tmp_path, monkeypatch):
+    """Test watermarks older than the pruned tombstones, or a deleted user's, need a resync"""
+    monkeypatch.setattr(memory_store, "CHANGE_LOG_RETENTION", 2)
+    monkeypatch.setattr(sqlite_store, "CHANGE_LOG_RETENTION", 2)
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db")) if backend == "sqlite" else TaskStore()
+
+    ids = [store.create(1, f"Task {i}")["id"] for i in range(8)]
+    for task_id in ids[:6]:
+        store.delete(task_id, 1)
+
+    version, changes = store.changes(1)
+    assert version == 14
+    assert store.changes(1, since=0) is None
+    assert {task_id for _, task_id, task in changes if task} == set(ids[6:])
+    assert len(changes) < 8
+    assert store.changes(1, since=13) == (14, [(14, ids[5], None)])
+    assert store.check_consistency() == []
+
+    store.delete_user_tasks(1)
+    assert store.changes(1, since=14) is None
+    assert store.changes(1, since=store.version(1)) == (store.version(1), [])